@@ -0,0 +1,171 @@
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+import numpy as np
+
+
+def normalizeName(name) -> str:
+    """
+    Lowercases a name and drops accents and punctuation, e.g.
+    "Fälldin, Pär (II)" -> "falldin par ii".
+    """
+    name = unicodedata.normalize("NFKD", name)
+    chars = [c if c.isalnum() else " " for c in name.lower() if not unicodedata.combining(c)]
+    return " ".join("".join(chars).split())
+
+
+def nameKeys(name) -> list[str]:
+    """
+    Returns the search keys of an actor name: the name as stored
+    ("bacon kevin") and in first-last order ("kevin bacon").
+    """
+    keys = [normalizeName(name)]
+    if "," in name:
+        last, first = name.split(",", 1)
+        keys.append(normalizeName(first + " " + last))
+    return keys
+
+
+def trigrams(text) -> set[str]:
+    """
+    Returns the set of 3-letter substrings of text, padded so short words have some too.
+    """
+    text = "  " + text + " "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ActorIndex:
+    """
+    An index over actor names for prefix and fuzzy (misspelled) lookups.
+
+    Prefix search uses a sorted list of normalized keys with bisect. Fuzzy
+    search uses a trigram index: the posting lists of the query's trigrams
+    are counted with np.bincount, which gives the number of shared trigrams
+    of every name at once, and names are ranked by trigram Jaccard similarity.
+
+    Parameters
+    ----------
+    names : iterable of str
+        The actor names, as used in adjList.
+
+    Attributes
+    ----------
+    names : list of str
+        The indexed names; their positions are the IDs used below.
+    keys : list of tuple[str, int]
+        The sorted (normalized key, name ID) pairs.
+    postings : dict of str to array of int
+        The name IDs of the names that have each trigram (of either key).
+    gramCounts : array of int
+        The number of distinct trigrams of every name.
+    """
+
+    def __init__(self, names) -> None:
+        self.names = []
+        self.keys = []
+        self.postings = {}
+        self.gramCounts = array("i")
+        for name in names:
+            self._addName(name)
+        self.keys.sort()
+
+    def _addName(self, name, keepSorted = False) -> None:
+        nameId = len(self.names)
+        self.names.append(name)
+        keys = nameKeys(name)
+        for key in keys:
+            if keepSorted:
+                insort(self.keys, (key, nameId))
+            else:
+                self.keys.append((key, nameId))
+        grams = set().union(*map(trigrams, keys))
+        for gram in grams:
+            self.postings.setdefault(gram, array("i")).append(nameId)
+        self.gramCounts.append(len(grams))
+
+    def add(self, name) -> None:
+        """
+        Adds one name to the index, keeping keys sorted.
+        """
+        self._addName(name, keepSorted = True)
+
+    def prefixSearch(self, query, limit = 10) -> list[str]:
+        """
+        Finds the names that have a key starting with the query.
+
+        Parameters
+        ----------
+        query : str
+            The start of a name, in "last, first" or "first last" order.
+        limit : int, optional
+            The maximum number of names to return.
+
+        Returns
+        -------
+        list of str
+            The matching names in key order.
+        """
+        prefix = normalizeName(query)
+        results = []
+        seen = set()
+        i = bisect_left(self.keys, (prefix, -1))
+        while i < len(self.keys) and len(results) < limit:
+            key, nameId = self.keys[i]
+            if not key.startswith(prefix):
+                break
+            if nameId not in seen:
+                seen.add(nameId)
+                results.append(self.names[nameId])
+            i += 1
+        return results
+
+    def fuzzySearch(self, query, limit = 10, minScore = 0.3) -> list[tuple[str, float]]:
+        """
+        Finds the names most similar to a possibly misspelled query.
+
+        Parameters
+        ----------
+        query : str
+            The (partial or misspelled) name.
+        limit : int, optional
+            The maximum number of names to return.
+        minScore : float, optional
+            The lowest trigram similarity (0 to 1) to return.
+
+        Returns
+        -------
+        list of tuple[str, float]
+            (name, similarity), most similar first.
+        """
+        grams = trigrams(normalizeName(query))
+        lists = [np.frombuffer(self.postings[gram], dtype = np.int32)
+                 for gram in grams if gram in self.postings]
+        if not lists:
+            return []
+        shared = np.bincount(np.concatenate(lists), minlength = len(self.names))
+        # Jaccard similarity is at most |Q & N| / |Q|, so only names sharing
+        # enough trigrams need to be scored.
+        candidates = np.flatnonzero(shared >= max(1, minScore * len(grams)))
+        shared = shared[candidates]
+        gramCounts = np.frombuffer(self.gramCounts, dtype = np.int32)[candidates]
+        scores = shared / (len(grams) + gramCounts - shared)
+
+        limit = min(limit, len(scores))
+        if limit == 0:
+            return []
+        best = np.argpartition(-scores, limit - 1)[:limit]
+        best = best[np.lexsort((candidates[best], -scores[best]))]
+        return [(self.names[candidates[i]], float(scores[i])) for i in best if scores[i] >= minScore]
+
+    def search(self, query, limit = 10) -> list[str]:
+        """
+        Finds candidate names for a query: prefix matches first, then fuzzy matches.
+        """
+        results = self.prefixSearch(query, limit)
+        if len(results) < limit:
+            for name, _ in self.fuzzySearch(query, limit):
+                if name not in results:
+                    results.append(name)
+                if len(results) == limit:
+                    break
+        return results
@@ -0,0 +1,276 @@
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# The search used by the BFS helpers below: a CompactGraph, BipartiteGraph or
+# FrontierBFS, all with distanceArray over actor IDs. In worker processes it
+# is set once by _initWorker instead of being sent along with every task,
+# together with the actor IDs the pivot sums are kept for.
+_search = None
+_targetIds = None
+
+
+def _initWorker(search, targetIds) -> None:
+    global _search, _targetIds
+    _search = search
+    _targetIds = targetIds
+
+
+def _distances(sourceId) -> np.ndarray:
+    """
+    Returns the distance from sourceId to every actor ID in _search, -1 if unreachable.
+    """
+    return np.frombuffer(_search.distanceArray(sourceId), dtype = np.int32)
+
+
+def _distanceSums(sourceIds) -> list[tuple[int, int, int]]:
+    """
+    Runs one BFS per source and returns (source ID, reached actors, sum of distances).
+    """
+    results = []
+    for sourceId in sourceIds:
+        distances = _distances(sourceId)
+        reached = distances[distances > 0]
+        results.append((sourceId, len(reached), int(reached.sum())))
+    return results
+
+
+def _pivotSums(pivotIds) -> list[tuple[np.ndarray, np.ndarray]]:
+    """
+    Runs one BFS per pivot and returns, for every actor ID in _targetIds, the
+    sum of its distances to the pivots it reaches and the number of those pivots.
+    """
+    totals = np.zeros(len(_targetIds), dtype = np.int64)
+    counts = np.zeros(len(_targetIds), dtype = np.int64)
+    for pivotId in pivotIds:
+        distances = _distances(pivotId)[_targetIds]
+        reached = distances > 0 # Skip unreachable pivots and the actor itself.
+        totals += np.where(reached, distances, 0)
+        counts += reached
+    return [(totals, counts)]
+
+
+class GraphAnalytics:
+    """
+    Whole-graph statistics of the co-star graph of a BaconNumberCalculator.
+
+    Results are cached per graph version: when the calculator's graph changes,
+    its version changes and the cache is dropped on the next call.
+
+    Parameters
+    ----------
+    calculator : BaconNumberCalculator
+        The calculator whose graph is analysed.
+
+    Attributes
+    ----------
+    calculator : BaconNumberCalculator
+    cache : dict
+        The cached results for cacheVersion.
+    cacheVersion : int
+        The calculator version the cache belongs to.
+
+    Methods
+    -------
+    components()
+        Finds the connected components with union-find.
+
+    degreeHistogram()
+        Counts the actors with each number of co-stars.
+
+    closenessCentrality(actors, sampleSize, workers, vectorized)
+        Calculates the closeness centrality of actors.
+
+    bestCenters(k, sampleSize, workers)
+        Finds the k actors with the lowest average Bacon number.
+    """
+
+    def __init__(self, calculator) -> None:
+        self.calculator = calculator
+        self.cache = {}
+        self.cacheVersion = calculator.version
+
+    def _cached(self, key, compute):
+        """
+        Returns the cached result for key, computing it if needed.
+        """
+        if self.cacheVersion != self.calculator.version:
+            self.cache = {}
+            self.cacheVersion = self.calculator.version
+        if key not in self.cache:
+            self.cache[key] = compute()
+        return self.cache[key]
+
+    def components(self) -> list[list[str]]:
+        """
+        Finds the connected components of the graph with union-find.
+
+        Returns
+        -------
+        list of list of str
+            The actors of every component, largest component first.
+        """
+        return self._cached("components", self._components)
+
+    def _components(self) -> list[list[str]]:
+        # Every cast is one connected group, so it is enough to join each cast
+        # member to the first one: the work is the total cast size, not the
+        # number of co-star pairs.
+        calculator = self.calculator
+        if calculator.graph is None:
+            actors = calculator._actors()
+            ids = {actor: i for i, actor in enumerate(actors)}
+            casts = ([ids[actor] for actor in cast] for cast in calculator.movieCasts.values())
+        else:
+            graph = calculator.graph
+            actors = graph.actors.names
+            castOffsets, castActors = graph.castOffsets.tolist(), graph.castActors.tolist()
+            casts = (castActors[castOffsets[m]:castOffsets[m + 1]] for m in range(len(castOffsets) - 1))
+        parent = list(range(len(actors)))
+
+        def find(i):
+            root = i
+            while parent[root] != root:
+                root = parent[root]
+            while parent[i] != root: # Path compression.
+                parent[i], i = root, parent[i]
+            return root
+
+        for cast in casts:
+            if not cast:
+                continue
+            root1 = find(cast[0])
+            for member in cast[1:]:
+                root2 = find(member)
+                if root1 != root2:
+                    parent[root2] = root1
+
+        groups = {}
+        for i, actor in enumerate(actors):
+            groups.setdefault(find(i), []).append(actor)
+        return sorted(groups.values(), key = len, reverse = True)
+
+    def componentSizes(self) -> list[int]:
+        """
+        Returns the size of every connected component, largest first.
+        """
+        return [len(component) for component in self.components()]
+
+    def degreeHistogram(self) -> dict[int, int]:
+        """
+        Counts the actors with each number of co-stars.
+
+        Returns
+        -------
+        dict of int to int
+            {degree: number of actors}, sorted by degree.
+        """
+        def compute():
+            calculator = self.calculator
+            if calculator.graph is None:
+                counts = Counter(len(neighbors) for neighbors in calculator.adjList.values())
+            else:
+                degrees, actorCounts = np.unique(calculator.graph.degrees(), return_counts = True)
+                counts = dict(zip(degrees.tolist(), actorCounts.tolist()))
+            return dict(sorted(counts.items()))
+        return self._cached("degreeHistogram", compute)
+
+    def closenessCentrality(self, actors = None, sampleSize = None, workers = None,
+                            vectorized = False) -> dict[str, float]:
+        """
+        Calculates the closeness centrality of actors: 1 / their average Bacon
+        number to the other actors they can reach.
+
+        Every BFS runs over actor IDs: the ID arrays of a csr or bipartite
+        graph, or the FrontierBFS of the calculator.
+
+        Parameters
+        ----------
+        actors : list of str, optional
+            The actors to score. Default is every actor; that is one BFS per
+            actor, so large graphs should use sampleSize.
+        sampleSize : int, optional
+            If given, the average distance of every actor is estimated from BFS
+            runs of sampleSize random pivot actors instead: the distance from
+            an actor to a pivot is the distance from the pivot to the actor.
+        workers : int, optional
+            The number of processes running the BFS sources. None runs in this
+            process. Every worker gets the FrontierBFS arrays once, at start-up.
+        vectorized : bool, optional
+            Run every BFS layer by layer with NumPy (see
+            BaconNumberCalculator.frontierSearch). The dict backend and the
+            workers always do.
+
+        Returns
+        -------
+        dict of str to float
+            The closeness of every scored actor; 0 for an actor that reaches no one.
+        """
+        calculator = self.calculator
+        if actors is None:
+            actors = calculator._actors()
+        actors = [actor for actor in actors if calculator._hasActor(actor)]
+        key = ("closeness", tuple(actors), sampleSize)
+        return self._cached(key, lambda: self._closeness(actors, sampleSize, workers, vectorized))
+
+    def _closeness(self, actors, sampleSize, workers, vectorized) -> dict[str, float]:
+        parallel = workers is not None and workers > 1
+        if vectorized or parallel or self.calculator.graph is None:
+            search = self.calculator.frontierSearch()
+        else:
+            search = self.calculator.graph
+        actorIds = np.array([search.actors.ids[actor] for actor in actors], dtype = np.int64)
+        if sampleSize is None:
+            sums = self._runSources(_distanceSums, actorIds.tolist(), search, actorIds, workers)
+            return {search.actors.names[sourceId]: (reached / total if total else 0)
+                    for sourceId, reached, total in sums}
+
+        pivots = random.sample(range(len(search.actors)), min(sampleSize, len(search.actors)))
+        totals = np.zeros(len(actors), dtype = np.int64)
+        counts = np.zeros(len(actors), dtype = np.int64)
+        for chunkTotals, chunkCounts in self._runSources(_pivotSums, pivots, search, actorIds, workers):
+            totals += chunkTotals
+            counts += chunkCounts
+        return {actor: (int(count) / int(total) if total else 0)
+                for actor, count, total in zip(actors, counts, totals)}
+
+    def _runSources(self, task, sources, search, targetIds, workers) -> list:
+        """
+        Runs task over chunks of source IDs, in a process pool if workers is given.
+        """
+        if workers is None or workers <= 1:
+            _initWorker(search, targetIds)
+            return task(sources)
+
+        chunkSize = max(1, len(sources) // (workers * 4))
+        chunks = [sources[i:i + chunkSize] for i in range(0, len(sources), chunkSize)]
+        results = []
+        with ProcessPoolExecutor(max_workers = workers, initializer = _initWorker,
+                                 initargs = (search, targetIds)) as executor:
+            for chunkResult in executor.map(task, chunks):
+                results.extend(chunkResult)
+        return results
+
+    def bestCenters(self, k = 10, sampleSize = None, workers = None,
+                    vectorized = False) -> list[tuple[str, float]]:
+        """
+        Finds the "centre of Hollywood": the actors with the lowest average
+        Bacon number in the largest connected component.
+
+        Parameters
+        ----------
+        k : int, optional
+            The number of actors to return.
+        sampleSize, workers, vectorized
+            See closenessCentrality.
+
+        Returns
+        -------
+        list of tuple[str, float]
+            (actor, average Bacon number), lowest average first.
+        """
+        largest = self.components()[0] if self.components() else []
+        closeness = self.closenessCentrality(largest, sampleSize, workers, vectorized)
+        best = sorted(closeness.items(), key = lambda item: item[1], reverse = True)[:k]
+        return [(actor, 1 / score if score else float("inf")) for actor, score in best]
@@ -0,0 +1,243 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from bacon_number import BaconNumberCalculator
+from bacon_server import percentile
+
+DataDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+Datasets = {
+    "mini": os.path.join(DataDir, "mini_graph.txt"),
+    "popular": os.path.join(DataDir, "PopularCast.txt"),
+    "bacon06": os.path.join(DataDir, "Bacon_06.txt"),
+}
+
+
+def writeSyntheticGraph(fileName, actors, movies, castSize, seed = 17) -> None:
+    """
+    Writes a random movie data file in the format of the data files.
+
+    Actor popularity is skewed (a few actors appear in many movies), like in
+    the real data, so the graph has hubs and one large component.
+
+    Parameters
+    ----------
+    fileName : str
+        The file to write.
+    actors : int
+        The number of distinct actor names to draw from.
+    movies : int
+        The number of movies.
+    castSize : int
+        The average cast size; every movie has 2 to 2 * castSize - 2 actors.
+    seed : int, optional
+        The random seed, so a synthetic graph can be rebuilt exactly.
+    """
+    rng = random.Random(seed)
+    f = open(fileName, mode = "w", encoding = "ISO-8859-1")
+    for movieId in range(movies):
+        size = min(actors, rng.randint(2, max(2, 2 * castSize - 2)))
+        cast = set()
+        while len(cast) < size:
+            cast.add(int(actors * rng.random() ** 2))
+        names = "/".join(f"Actor{actorId}, Synthetic" for actorId in sorted(cast))
+        f.write(f"Movie {movieId} ({rng.randint(1920, 2020)})/{names}\n")
+    f.close()
+
+
+def gitRevision() -> str | None:
+    """
+    Returns the current git commit of the repository, or None outside a checkout.
+    """
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output = True, text = True,
+                                cwd = os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def _peakRss() -> int:
+    """
+    Returns the peak resident set size of this process in bytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024 # Linux reports KiB.
+
+
+def _edgeCount(calculator) -> int:
+    if calculator.graph is not None:
+        return calculator.graph.edgeCount()
+    return sum(len(neighbors) for neighbors in calculator.adjList.values()) // 2
+
+
+def runBenchmark(fileName, backend = "dict", queries = 200, avgQueries = 3, seed = 17) -> dict:
+    """
+    Loads one data file with one backend and times it.
+
+    This is meant to run in a fresh process (see benchmark), so that the peak
+    RSS belongs to this run alone.
+
+    Parameters
+    ----------
+    fileName : str
+        The movie data file.
+    backend : str, optional
+        The BaconNumberCalculator backend.
+    queries : int, optional
+        The number of random calcBaconNumber queries.
+    avgQueries : int, optional
+        The number of random exact calcAvgNumber queries.
+    seed : int, optional
+        The random seed of the query actors.
+
+    Returns
+    -------
+    dict
+        The timings: parse seconds, edges, edges per second, peak RSS, and the
+        latency percentiles (in ms) and visited actors of the queries.
+    """
+    baseRss = _peakRss()
+    start = time.perf_counter()
+    calculator = BaconNumberCalculator(fileName, backend)
+    parseSeconds = time.perf_counter() - start
+    edges = _edgeCount(calculator)
+    actors = sorted(calculator._actors())
+
+    rng = random.Random(seed)
+    latencies = []
+    visited = []
+    found = 0
+    for _ in range(queries if actors else 0):
+        startActor, endActor = rng.choice(actors), rng.choice(actors)
+        start = time.perf_counter()
+        baconNumber, _ = calculator.calcBaconNumber(startActor, endActor)
+        latencies.append((time.perf_counter() - start) * 1000)
+        visited.append(calculator.lastVisited)
+        found += baconNumber != -1
+
+    avgLatencies = []
+    for _ in range(avgQueries if actors else 0):
+        startActor = rng.choice(actors)
+        start = time.perf_counter()
+        calculator.calcAvgNumber(startActor, mode = "exact")
+        avgLatencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "file": os.path.basename(fileName),
+        "backend": backend,
+        "actors": len(actors),
+        "edges": edges,
+        "edgeKind": "actor-movie" if backend == "bipartite" else "co-star",
+        "parseSeconds": parseSeconds,
+        "edgesPerSecond": edges / parseSeconds if parseSeconds else 0,
+        "peakRssBytes": _peakRss(),
+        "loadRssBytes": _peakRss() - baseRss,
+        "baconNumber": {
+            "queries": len(latencies),
+            "found": found,
+            "p50Ms": percentile(latencies, 50),
+            "p90Ms": percentile(latencies, 90),
+            "p99Ms": percentile(latencies, 99),
+            "maxMs": max(latencies, default = 0),
+            "meanVisited": sum(visited) / len(visited) if visited else 0,
+            "maxVisited": max(visited, default = 0),
+        },
+        "avgNumber": {
+            "queries": len(avgLatencies),
+            "p50Ms": percentile(avgLatencies, 50),
+            "maxMs": max(avgLatencies, default = 0),
+        },
+    }
+
+
+def benchmark(datasets, backends = ("dict",), queries = 200, avgQueries = 3, seed = 17) -> dict:
+    """
+    Runs runBenchmark for every dataset and backend, each in a new process.
+
+    Parameters
+    ----------
+    datasets : dict of str to str
+        {dataset name: data file}.
+    backends : iterable of str, optional
+        The backends to run every dataset with.
+    queries, avgQueries, seed
+        See runBenchmark.
+
+    Returns
+    -------
+    dict
+        {"meta": {...}, "runs": [...]}, ready to be written as JSON.
+    """
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for name, fileName in datasets.items():
+        for backend in backends:
+            with ProcessPoolExecutor(max_workers = 1, mp_context = context) as executor:
+                run = executor.submit(runBenchmark, fileName, backend, queries, avgQueries, seed).result()
+            run["dataset"] = name
+            runs.append(run)
+            print(f"{name:>12} {backend:>9}: parse {run['parseSeconds']:.3f}s, "
+                  f"p50 {run['baconNumber']['p50Ms']:.3f}ms, "
+                  f"peak RSS {run['peakRssBytes'] / 2 ** 20:.1f} MiB", file = sys.stderr)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "gitRevision": gitRevision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "queries": queries,
+            "avgQueries": avgQueries,
+            "seed": seed,
+        },
+        "runs": runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Benchmark graph loading and Bacon number queries.")
+    parser.add_argument("--datasets", nargs = "+", default = list(Datasets),
+                        help = f"Any of {', '.join(Datasets)}, synthetic, or a data file path.")
+    parser.add_argument("--backends", nargs = "+", default = ["dict", "csr", "bipartite"])
+    parser.add_argument("--queries", type = int, default = 200)
+    parser.add_argument("--avg-queries", type = int, default = 3)
+    parser.add_argument("--seed", type = int, default = 17)
+    parser.add_argument("--synthetic-actors", type = int, default = 20000)
+    parser.add_argument("--synthetic-movies", type = int, default = 5000)
+    parser.add_argument("--cast-size", type = int, default = 8)
+    parser.add_argument("--output", default = None, help = "The JSON file to write. Default is stdout.")
+    args = parser.parse_args()
+
+    tmpDir = tempfile.TemporaryDirectory()
+    datasets = {}
+    for name in args.datasets:
+        if name == "synthetic":
+            fileName = os.path.join(tmpDir.name, "synthetic.txt")
+            writeSyntheticGraph(fileName, args.synthetic_actors, args.synthetic_movies,
+                                args.cast_size, args.seed)
+            name = f"synthetic-{args.synthetic_actors}x{args.synthetic_movies}x{args.cast_size}"
+            datasets[name] = fileName
+        else:
+            datasets[name] = Datasets.get(name, name)
+
+    results = benchmark(datasets, args.backends, args.queries, args.avg_queries, args.seed)
+    tmpDir.cleanup()
+    if args.output is None:
+        print(json.dumps(results, indent = 4))
+    else:
+        f = open(args.output, mode = "w")
+        json.dump(results, f, indent = 4)
+        f.close()
+
+
+if __name__ == '__main__':
+    main()
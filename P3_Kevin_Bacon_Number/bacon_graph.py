@@ -0,0 +1,1098 @@
+import os
+import re
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+
+def readMovieFile(fileName):
+    """
+    Reads a movie data file and yields one movie at a time.
+
+    Parameters
+    ----------
+    fileName : str
+        The name of the file containing the movie data.
+        Every line looks like: movie/actor1/actor2/...
+
+    Yields
+    ------
+    tuple[str, list[str]]
+        The movie title and the list of actors in the movie.
+    """
+    f = open(fileName, mode = "r", encoding='ISO-8859-1')
+    for line in f:
+        components = line.strip().split("/")
+        if not components[0]:
+            continue
+        yield components[0].strip(), components[1:]
+    f.close()
+
+
+# The release year in a title, e.g. "(2006)" or "(2006 II)".
+YearPattern = re.compile(r"\((\d{4})(?:[ /][IVXL]+)?\)")
+
+
+def parseYear(title) -> int:
+    """
+    Returns the release year of a movie title, or 0 if it has none.
+    """
+    matches = YearPattern.findall(title)
+    return int(matches[-1]) if matches else 0
+
+
+def yearFilter(minYear = None, maxYear = None):
+    """
+    Returns a predicate year -> bool for a year range, or None if there is no range.
+    A movie with an unknown year (0) is outside every range.
+    """
+    if minYear is None and maxYear is None:
+        return None
+    low = minYear if minYear is not None else 1
+    high = maxYear if maxYear is not None else 9999
+    return lambda year: low <= year <= high
+
+
+def shardFile(fileName, shardCount):
+    """
+    Splits a file into byte ranges of about the same size.
+
+    Parameters
+    ----------
+    fileName : str
+        The movie data file.
+    shardCount : int
+        The number of shards.
+
+    Returns
+    -------
+    list of tuple[str, int, int]
+        (fileName, start, end) for every shard. A shard owns the lines that
+        start inside [start, end), so the boundaries need not be on line breaks.
+    """
+    size = os.path.getsize(fileName)
+    shardCount = max(1, min(shardCount, size))
+    bounds = [size * i // shardCount for i in range(shardCount + 1)]
+    return [(fileName, bounds[i], bounds[i + 1]) for i in range(shardCount)]
+
+
+def parseShard(shard):
+    """
+    Parses the lines of one shard into a partial cast table with local IDs.
+
+    This runs in a worker process, so it only returns plain lists and arrays.
+
+    Parameters
+    ----------
+    shard : tuple[str, int, int]
+        (fileName, start, end) from shardFile.
+
+    Returns
+    -------
+    tuple
+        (actor names, movie titles, castOffsets, castActors) where the cast
+        actor IDs index into this shard's actor names.
+    """
+    fileName, start, end = shard
+    actors = NameTable()
+    movies = []
+    castOffsets = array("i", [0])
+    castActors = array("i")
+
+    f = open(fileName, mode = "rb")
+    pos = start
+    if start > 0:
+        f.seek(start - 1)
+        pos += len(f.readline()) - 1 # Skip the line owned by the previous shard.
+    while pos < end:
+        line = f.readline()
+        if not line:
+            break
+        pos += len(line)
+        components = line.decode("ISO-8859-1").strip().split("/")
+        if not components[0]:
+            continue
+        movies.append(components[0].strip())
+        castActors.extend(actors.intern(actor) for actor in components[1:])
+        castOffsets.append(len(castActors))
+    f.close()
+    return actors.names, movies, castOffsets, castActors
+
+
+def parseMovieFiles(fileNames, workers = None):
+    """
+    Parses one or more movie data files into a BipartiteGraph, optionally in parallel.
+
+    Every file is split into byte-range shards that are parsed by parseShard
+    in a ProcessPoolExecutor. The partial tables are then merged in file
+    order: each shard's local actor IDs are mapped to global IDs once per
+    distinct name, and its cast arrays are remapped.
+
+    Parameters
+    ----------
+    fileNames : str or list of str
+        The movie data file(s), e.g. ["Bacon_06.txt", "PopularCast.txt"].
+    workers : int, optional
+        The number of worker processes. None or 1 parses in this process.
+
+    Returns
+    -------
+    BipartiteGraph
+    """
+    if isinstance(fileNames, str):
+        fileNames = [fileNames]
+    if workers is None or workers <= 1:
+        partials = [parseShard(shard) for fileName in fileNames
+                    for shard in shardFile(fileName, 1)]
+    else:
+        shards = [shard for fileName in fileNames for shard in shardFile(fileName, workers)]
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            partials = list(executor.map(parseShard, shards))
+
+    actors = NameTable()
+    movies = NameTable()
+    castOffsets = array("i", [0])
+    castActors = array("i")
+    repeated = {}
+    for actorNames, movieTitles, partialOffsets, partialActors in partials:
+        globalIds = [actors.intern(name) for name in actorNames]
+        for j in range(len(movieTitles)):
+            castIds = [globalIds[partialActors[k]] for k in range(partialOffsets[j], partialOffsets[j + 1])]
+            if movieTitles[j] in movies: # A repeated title adds to its cast, see mergeCasts.
+                repeated.setdefault(movies.ids[movieTitles[j]], []).extend(castIds)
+                continue
+            movies.intern(movieTitles[j])
+            castActors.extend(castIds)
+            castOffsets.append(len(castActors))
+    castOffsets, castActors = mergeCasts(castOffsets, castActors, repeated)
+    return BipartiteGraph(actors, movies, castOffsets, castActors)
+
+
+def mergeCasts(castOffsets, castActors, repeated):
+    """
+    Adds the actors of repeated titles to the casts they repeat.
+
+    A title that appears on several lines is one movie whose cast is the
+    union of the lines, as in BaconNumberCalculator._addCast, whichever
+    backend or number of workers parses the file.
+
+    Parameters
+    ----------
+    castOffsets, castActors : array of int
+        The casts of the first line of every title, in CSR form.
+    repeated : dict of int to list of int
+        The actor IDs of the later lines of a movie ID.
+
+    Returns
+    -------
+    tuple[array, array]
+        The merged castOffsets and castActors; the given ones if nothing repeats.
+    """
+    if not repeated:
+        return castOffsets, castActors
+    offsets = array("i", [0])
+    actors = array("i")
+    for movieId in range(len(castOffsets) - 1):
+        cast = castActors[castOffsets[movieId]:castOffsets[movieId + 1]]
+        actors.extend(cast)
+        seen = set(cast)
+        for actorId in repeated.get(movieId, ()):
+            if actorId not in seen:
+                seen.add(actorId)
+                actors.append(actorId)
+        offsets.append(len(actors))
+    return offsets, actors
+
+
+# The number of keys decoded at a time when building a CompactGraph.
+BlockSize = 1 << 18
+
+
+def _blocks(length):
+    """
+    Yields slices that cover range(length) in BlockSize steps.
+    """
+    for start in range(0, length, BlockSize):
+        yield slice(start, min(start + BlockSize, length))
+
+
+def _toArray(typecode, values):
+    """
+    Copies a NumPy array into an array of the given typecode.
+    """
+    result = array(typecode)
+    result.frombytes(memoryview(np.ascontiguousarray(values, dtype = np.dtype(typecode))).cast("B"))
+    return result
+
+
+def _decodePairs(keys, actorCount, movieCount):
+    """
+    Splits pair keys from coStarPairKeys into (lo, hi, movie) ID arrays.
+    """
+    pairs, movieIds = np.divmod(keys, movieCount)
+    lo, hi = np.divmod(pairs, actorCount)
+    return lo, hi, movieIds
+
+
+def _castPairKeys(castOffsets, castActors, actorCount):
+    """
+    Returns the unsorted pair keys of every cast (see coStarPairKeys), self-pairs left out.
+    """
+    movieCount = len(castOffsets) - 1
+    castOffsets = np.asarray(castOffsets, dtype = np.int64)
+    castActors = np.asarray(castActors, dtype = np.int64)
+    sizes = np.diff(castOffsets)
+    keys = np.empty(int((sizes * (sizes - 1) // 2).sum()), dtype = np.int64)
+    count = 0
+    for size in np.unique(sizes[sizes > 1]):
+        allFirst, allSecond = np.triu_indices(size, 1)
+        movieIds = np.flatnonzero(sizes == size)
+        step = max(1, BlockSize // len(allFirst)) # Movies per batch, about BlockSize pairs.
+        for i in range(0, len(movieIds), step):
+            batch = movieIds[i:i + step]
+            casts = castActors[castOffsets[batch, None] + np.arange(size)]
+            for pairBlock in _blocks(len(allFirst)): # A large cast is split into several blocks.
+                a, b = casts[:, allFirst[pairBlock]], casts[:, allSecond[pairBlock]]
+                lo, hi = np.minimum(a, b), np.maximum(a, b)
+                batchKeys = ((lo * actorCount + hi) * movieCount + batch[:, None])[lo != hi]
+                keys[count:count + len(batchKeys)] = batchKeys
+                count += len(batchKeys)
+    return keys[:count]
+
+
+def coStarPairKeys(castOffsets, castActors, actorCount):
+    """
+    Returns every pair of actors who share a movie, once, with the first movie they share.
+
+    A pair (lo, hi) with lo < hi from movie m is packed into one int64 key,
+    (lo * actorCount + hi) * movieCount + m, so a single in-place sort orders
+    the keys by pair and then by movie, and the first key of every pair is
+    kept. The pairs of all the casts of one size are generated at once with
+    np.triu_indices, and the duplicates are removed in place, so the peak
+    memory is about one key per pair.
+
+    Parameters
+    ----------
+    castOffsets, castActors : array of int
+        The casts in CSR form, as in BipartiteGraph.
+    actorCount : int
+        The number of actor IDs.
+
+    Returns
+    -------
+    ndarray of int64
+        The sorted keys, decoded with _decodePairs.
+    """
+    movieCount = len(castOffsets) - 1
+    if actorCount * actorCount * max(movieCount, 1) >= 2 ** 63:
+        raise OverflowError("Too many actors and movies for 64-bit pair keys")
+    keys = _castPairKeys(castOffsets, castActors, actorCount)
+    keys.sort()
+
+    count = 0
+    previous = -1
+    for block in _blocks(len(keys)):
+        pairs = keys[block] // movieCount
+        keep = pairs != np.concatenate(([previous], pairs[:-1]))
+        previous = pairs[-1]
+        kept = keys[block][keep]
+        keys[count:count + len(kept)] = kept # Never past the block being read.
+        count += len(kept)
+    return keys[:count]
+
+
+def coStarDegrees(castOffsets, castActors, actorCount) -> np.ndarray:
+    """
+    Returns the number of distinct co-stars of every actor ID, counted from
+    the co-star pairs (see coStarPairKeys) without building the co-star graph.
+    """
+    movieCount = len(castOffsets) - 1
+    keys = coStarPairKeys(castOffsets, castActors, actorCount)
+    counts = np.zeros(actorCount, dtype = np.int64)
+    for block in _blocks(len(keys)):
+        lo, hi, _ = _decodePairs(keys[block], actorCount, movieCount)
+        counts += np.bincount(lo, minlength = actorCount) + np.bincount(hi, minlength = actorCount)
+    return counts
+
+
+def csrPositions(offsets, rows) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the positions offsets[r]:offsets[r+1] of all CSR rows at once, and
+    the length of every row, so the rows can be gathered with one fancy index.
+    """
+    starts = offsets[rows]
+    counts = offsets[rows + 1] - starts
+    total = int(counts.sum())
+    # Position k of the output is starts[r] + (k - the output start of row r).
+    rowStarts = np.cumsum(counts) - counts
+    index = np.arange(total, dtype = np.int64) + np.repeat(starts - rowStarts, counts)
+    return index, counts
+
+
+class NameTable:
+    """
+    Interns strings (actor names or movie titles) to small integer IDs.
+
+    Attributes
+    ----------
+    names : list of str
+        names[i] is the string with ID i.
+    ids : dict of str to int
+        The reverse mapping from a string to its ID.
+    """
+
+    def __init__(self, names = None) -> None:
+        # names, if given, must already be unique (e.g. loaded from a snapshot).
+        self.names = list(names or [])
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name) -> bool:
+        return name in self.ids
+
+    def intern(self, name) -> int:
+        """
+        Returns the ID of name, giving it a new ID if it is not seen before.
+        """
+        nameId = self.ids.get(name)
+        if nameId is None:
+            nameId = len(self.names)
+            self.ids[name] = nameId
+            self.names.append(name)
+        return nameId
+
+
+class CompactGraph:
+    """
+    A compact co-star graph with actors and movies interned to integer IDs.
+
+    The adjacency is stored in CSR (compressed sparse row) form: the neighbors
+    of actor i are targets[offsets[i]:offsets[i+1]], and edgeMovies holds the
+    movie ID of each of those edges. Like adjList, only one movie is kept per
+    pair of actors. The casts it was built from are kept as well (they are
+    small next to the edges), for the searches that need every movie two
+    actors share, see casts.
+
+    Attributes
+    ----------
+    actors : NameTable
+        The interned actor names.
+    movies : NameTable
+        The interned movie titles.
+    offsets : array of int
+        The start of each actor's neighbors in targets, length len(actors) + 1.
+    targets : array of int
+        The actor IDs of all edges.
+    edgeMovies : array of int
+        The movie ID of each edge, parallel to targets.
+    castOffsets, castActors : array of int or None
+        The cast of every movie, as in BipartiteGraph.
+    lastVisited : int
+        The number of actors visited by the last calcBaconNumber search.
+    """
+
+    # The arrays that make up the graph, as saved in a snapshot.
+    Arrays = ("offsets", "targets", "edgeMovies", "castOffsets", "castActors")
+
+    def __init__(self, actors, movies, offsets, targets, edgeMovies, castOffsets = None,
+                 castActors = None) -> None:
+        self.actors = actors
+        self.movies = movies
+        self.offsets = offsets
+        self.targets = targets
+        self.edgeMovies = edgeMovies
+        self.castOffsets = castOffsets
+        self.castActors = castActors
+        self._casts = None
+        self._arrays = None # The arrays as NumPy arrays, for _expandLayer.
+        self.lastVisited = 0
+
+    @classmethod
+    def fromArrays(cls, actors, movies, arrays):
+        """
+        Rebuilds the graph from its name tables and the arrays listed in Arrays,
+        e.g. memoryviews from a snapshot.
+        """
+        return cls(actors, movies, **arrays)
+
+    @classmethod
+    def fromBipartite(cls, graph):
+        """
+        Builds the co-star graph by expanding every cast of a BipartiteGraph.
+
+        The co-star pairs are generated and deduplicated as sorted NumPy keys
+        (see coStarPairKeys) and placed into the CSR arrays block by block, so
+        no per-actor container is built and the peak memory stays close to the
+        final arrays. Every actor's neighbors end up sorted by ID.
+
+        Parameters
+        ----------
+        graph : BipartiteGraph
+            The parsed casts, e.g. from parseMovieFiles. Its name tables are shared.
+
+        Returns
+        -------
+        CompactGraph
+        """
+        actorCount, movieCount = len(graph.actors), len(graph.castOffsets) - 1
+        keys = coStarPairKeys(graph.castOffsets, graph.castActors, actorCount)
+        # Both directions of every pair: the neighbors of an actor are the smaller
+        # IDs (from the pairs where it is hi) and then the larger ones (where it is lo).
+        lows = np.zeros(actorCount, dtype = np.int64)
+        highs = np.zeros(actorCount, dtype = np.int64)
+        for block in _blocks(len(keys)):
+            lo, hi, _ = _decodePairs(keys[block], actorCount, movieCount)
+            lows += np.bincount(lo, minlength = actorCount)
+            highs += np.bincount(hi, minlength = actorCount)
+        offsets = np.zeros(actorCount + 1, dtype = np.int64)
+        np.cumsum(lows + highs, out = offsets[1:])
+        # The arrays are filled through NumPy views, so they are never copied.
+        targetArray, movieArray = array("i", [0]) * int(offsets[-1]), array("i", [0]) * int(offsets[-1])
+        targets = np.frombuffer(targetArray, dtype = np.int32)
+        edgeMovies = np.frombuffer(movieArray, dtype = np.int32)
+
+        # The keys are sorted by (lo, hi): edge e is number e - loStarts[lo] of its lo row.
+        loStarts = np.cumsum(lows) - lows
+        for block in _blocks(len(keys)):
+            lo, hi, movieIds = _decodePairs(keys[block], actorCount, movieCount)
+            at = offsets[lo] + highs[lo] + np.arange(block.start, block.stop) - loStarts[lo]
+            targets[at] = hi
+            edgeMovies[at] = movieIds
+        # Re-key in place by (hi, lo) to place the other direction the same way.
+        for block in _blocks(len(keys)):
+            lo, hi, movieIds = _decodePairs(keys[block], actorCount, movieCount)
+            keys[block] = (hi * actorCount + lo) * movieCount + movieIds
+        keys.sort()
+        hiStarts = np.cumsum(highs) - highs
+        for block in _blocks(len(keys)):
+            hi, lo, movieIds = _decodePairs(keys[block], actorCount, movieCount)
+            at = offsets[hi] + np.arange(block.start, block.stop) - hiStarts[hi]
+            targets[at] = lo
+            edgeMovies[at] = movieIds
+        del keys
+
+        del targets, edgeMovies # Release the views, so the arrays can be resized again.
+        result = cls(graph.actors, graph.movies, _toArray("i", offsets), targetArray, movieArray,
+                     graph.castOffsets, graph.castActors)
+        result._casts = graph
+        return result
+
+    @classmethod
+    def fromMovies(cls, movieCasts):
+        """
+        Builds the graph from (movie, actors) pairs.
+
+        Parameters
+        ----------
+        movieCasts : iterable of tuple[str, list[str]]
+            The movie title and its cast, e.g. from readMovieFile.
+
+        Returns
+        -------
+        CompactGraph
+        """
+        return cls.fromBipartite(BipartiteGraph.fromMovies(movieCasts))
+
+    @classmethod
+    def fromFile(cls, fileName):
+        """
+        Builds the graph from a movie data file.
+        """
+        return cls.fromMovies(readMovieFile(fileName))
+
+    @classmethod
+    def fromFiles(cls, fileNames, workers = None):
+        """
+        Builds the graph from one or more movie data files, see parseMovieFiles.
+        """
+        return cls.fromBipartite(parseMovieFiles(fileNames, workers))
+
+    def __len__(self) -> int:
+        return len(self.actors)
+
+    def __contains__(self, actor) -> bool:
+        return actor in self.actors
+
+    def nbytes(self) -> int:
+        """
+        Returns the number of bytes used by the adjacency arrays.
+        """
+        return sum(a.itemsize * len(a) for a in map(self.__getattribute__, self.Arrays))
+
+    def edgeCount(self) -> int:
+        """
+        Returns the number of undirected co-star edges.
+        """
+        return len(self.targets) // 2
+
+    def degrees(self) -> np.ndarray:
+        """
+        Returns the number of co-stars of every actor ID.
+        """
+        return np.diff(np.asarray(self.offsets, dtype = np.int64))
+
+    def neighbors(self, actor, excludeMovies = ()):
+        """
+        Yields (neighbor, movie) name pairs for an actor, like adjList[actor].items().
+        With excludeMovies, the co-stars are found through the casts (see
+        casts), so a co-star linked by any other shared movie is still yielded.
+        """
+        if excludeMovies:
+            yield from self.casts().neighbors(actor, excludeMovies)
+            return
+        actorId = self.actors.ids[actor]
+        for k in range(self.offsets[actorId], self.offsets[actorId + 1]):
+            yield self.actors.names[self.targets[k]], self.movies.names[self.edgeMovies[k]]
+
+    def _pathFromParents(self, endId, parents, parentMovies):
+        """
+        Walks the parent arrays back from endId and returns the named path.
+        """
+        path = [self.actors.names[endId]]
+        curId = endId
+        while parents[curId] != curId:
+            path.append(self.movies.names[parentMovies[curId]])
+            curId = parents[curId]
+            path.append(self.actors.names[curId])
+        path.reverse()
+        return path
+
+    def calcBaconNumber(self, startActor, endActor, bidirectional = True) -> list[int | list[str]]:
+        """
+        Calculates the Bacon number between two actors with a BFS over the CSR arrays.
+
+        Parameters
+        ----------
+        bidirectional : bool, optional
+            Search from both ends (default, see _bidirectionalSearch), or only from startActor.
+
+        Returns
+        -------
+        List[int, List[str]]
+            The same result as BaconNumberCalculator.calcBaconNumber.
+        """
+        if startActor not in self.actors or endActor not in self.actors:
+            return [-1, []]
+        if startActor == endActor:
+            return [0, [startActor]]
+
+        startId = self.actors.ids[startActor]
+        endId = self.actors.ids[endActor]
+        if bidirectional:
+            return self._bidirectionalSearch(startId, endId)
+        offsets, targets, edgeMovies = self.offsets, self.targets, self.edgeMovies
+        # parents[i] == -1 means not visited yet; the start is its own parent.
+        parents = array("i", [-1]) * len(self.actors)
+        parentMovies = array("i", [0]) * len(self.actors)
+        parents[startId] = startId
+        visited = 1
+
+        queue = deque([startId])
+        while queue:
+            current = queue.popleft()
+            for k in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[k]
+                if parents[neighbor] == -1:
+                    parents[neighbor] = current
+                    visited += 1
+                    parentMovies[neighbor] = edgeMovies[k]
+                    if neighbor == endId:
+                        path = self._pathFromParents(endId, parents, parentMovies)
+                        self.lastVisited = visited
+                        return [(len(path) - 1) / 2, path]
+                    queue.append(neighbor)
+
+        self.lastVisited = visited
+        return [-1, []]
+
+    def _numpyArrays(self):
+        """
+        Returns the offsets, targets and edgeMovies arrays as NumPy arrays, built on first use.
+        """
+        if self._arrays is None:
+            self._arrays = (np.asarray(self.offsets, dtype = np.int64), np.asarray(self.targets),
+                            np.asarray(self.edgeMovies))
+        return self._arrays
+
+    def _newExpanded(self):
+        """
+        Returns the per-search state of _expandLayer; a CompactGraph needs none.
+        """
+        return None
+
+    def _expandLayer(self, frontier, expanded):
+        """
+        Returns the (co-star ID, parent ID, movie ID) arrays of every edge out of
+        the actor IDs in frontier, gathered with one NumPy call.
+        """
+        offsets, targets, edgeMovies = self._numpyArrays()
+        index, counts = csrPositions(offsets, frontier)
+        return targets[index], np.repeat(frontier, counts), edgeMovies[index]
+
+    def _bidirectionalSearch(self, startId, endId) -> list[int | list[str]]:
+        """
+        Finds the shortest path with a BFS from both ends that meets in the middle,
+        like BaconNumberCalculator._bidirectionalSearch but over the ID arrays.
+
+        Each round expands one whole layer of the smaller frontier with NumPy
+        (see _expandLayer, so the same code serves both graph classes): the
+        edges of the layer are gathered at once, the reached actors are
+        dropped with a mask, and one edge is kept per new actor. Every new
+        actor that the other side has already reached closes a path, and the
+        shortest one found in the layer is kept.
+
+        Returns
+        -------
+        List[int, List[str]]
+            The same result as BaconNumberCalculator.calcBaconNumber.
+        """
+        size = len(self.actors)
+        # Per side (0 from startId, 1 from endId): the parent (-1 if not reached),
+        # the movie to it and the distance of every actor ID.
+        parents = np.full((2, size), -1, dtype = np.int32)
+        parentMovies = np.zeros((2, size), dtype = np.int32)
+        distances = np.full((2, size), -1, dtype = np.int32)
+        expanded = [self._newExpanded(), self._newExpanded()]
+        frontiers = [np.array([startId]), np.array([endId])]
+        for side, actorId in enumerate((startId, endId)):
+            parents[side, actorId] = actorId
+            distances[side, actorId] = 0
+        depths = [0, 0]
+        visited = 2
+
+        meet = None
+        while len(frontiers[0]) and len(frontiers[1]) and meet is None:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            neighbors, sources, movieIds = self._expandLayer(frontiers[side], expanded[side])
+            new = distances[side, neighbors] == -1
+            # One edge per new actor, so each parent is stored with its own movie.
+            neighbors, first = np.unique(neighbors[new], return_index = True)
+            depths[side] += 1
+            parents[side, neighbors] = sources[new][first]
+            parentMovies[side, neighbors] = movieIds[new][first]
+            distances[side, neighbors] = depths[side]
+            visited += len(neighbors)
+            otherDist = distances[1 - side, neighbors]
+            reached = np.flatnonzero(otherDist != -1)
+            if len(reached):
+                meet = int(neighbors[reached[np.argmin(otherDist[reached])]])
+            frontiers[side] = neighbors
+
+        self.lastVisited = visited
+        if meet is None:
+            return [-1, []]
+        # The forward half start -> meet, then the backward half meet -> end.
+        path = self._pathFromParents(meet, parents[0], parentMovies[0])
+        current = meet
+        while current != endId:
+            path.append(self.movies.names[parentMovies[1, current]])
+            current = int(parents[1, current])
+            path.append(self.actors.names[current])
+        return [(len(path) - 1) / 2, path]
+
+    def casts(self):
+        """
+        Returns the BipartiteGraph of the casts, sharing the name tables, built on first use.
+
+        Raises
+        ------
+        ValueError
+            If the graph was built without its casts.
+        """
+        if self._casts is None:
+            if self.castOffsets is None or self.castActors is None:
+                raise ValueError("This CompactGraph was built without its casts")
+            self._casts = BipartiteGraph(self.actors, self.movies, self.castOffsets, self.castActors)
+        return self._casts
+
+    def calcBaconNumberConstrained(self, startActor, endActor, minYear = None, maxYear = None,
+                                   excludeMovies = (), excludeActors = ()) -> list[int | list[str]]:
+        """
+        Calculates the Bacon number using only the movies and actors that pass the filters.
+
+        The co-star edges keep one movie per pair of actors, so the search runs
+        on the casts instead (see casts): two actors stay connected as long as
+        one of the movies they share passes the filters, as with the other backends.
+        See BaconNumberCalculator.calcBaconNumberConstrained for the parameters.
+        """
+        return self.casts().calcBaconNumberConstrained(startActor, endActor, minYear, maxYear,
+                                                       excludeMovies, excludeActors)
+
+    def calcDistances(self, startActor) -> dict[str, int]:
+        """
+        Calculates the Bacon number from startActor to every reachable actor.
+
+        Returns
+        -------
+        dict of str to int
+            The same result as BaconNumberCalculator.calcDistances.
+        """
+        if startActor not in self.actors:
+            return {}
+        distances = self.distanceArray(self.actors.ids[startActor])
+        names = self.actors.names
+        return {names[i]: d for i, d in enumerate(distances) if d != -1}
+
+    def distanceArray(self, startId):
+        """
+        Calculates the Bacon number from startId to every actor ID, -1 if unreachable.
+        """
+        offsets, targets = self.offsets, self.targets
+        distances = array("i", [-1]) * len(self.actors)
+        distances[startId] = 0
+        queue = deque([startId])
+        while queue:
+            current = queue.popleft()
+            nextDist = distances[current] + 1
+            for k in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[k]
+                if distances[neighbor] == -1:
+                    distances[neighbor] = nextDist
+                    queue.append(neighbor)
+        return distances
+
+
+class BipartiteGraph:
+    """
+    A bipartite actor-movie graph: every cast is stored once instead of as a clique.
+
+    The casts are stored in CSR form (movie j has the actors
+    castActors[castOffsets[j]:castOffsets[j+1]]), and the reverse index
+    (actor i played in actorMovies[actorOffsets[i]:actorOffsets[i+1]]) is built
+    from it with a counting sort. A co-star hop is an actor -> movie -> actor
+    step, so Bacon numbers are unchanged.
+
+    Attributes
+    ----------
+    actors : NameTable
+        The interned actor names.
+    movies : NameTable
+        The interned movie titles.
+    castOffsets, castActors : array of int
+        The cast of every movie.
+    actorOffsets, actorMovies : array of int
+        The movies of every actor.
+    movieYears : array of int
+        The release year of every movie (0 if unknown); every actor-movie
+        edge of a movie shares it.
+    lastVisited : int
+        The number of actors visited by the last calcBaconNumber search.
+    """
+
+    Arrays = ("castOffsets", "castActors", "actorOffsets", "actorMovies", "movieYears")
+
+    def __init__(self, actors, movies, castOffsets, castActors, actorOffsets = None, actorMovies = None,
+                 movieYears = None) -> None:
+        self.actors = actors
+        self.movies = movies
+        self.castOffsets = castOffsets
+        self.castActors = castActors
+        if actorOffsets is None or actorMovies is None:
+            self._buildActorIndex()
+        else:
+            self.actorOffsets = actorOffsets
+            self.actorMovies = actorMovies
+        if movieYears is None:
+            movieYears = array("h", (parseYear(title) for title in movies.names))
+        self.movieYears = movieYears
+        self._arrays = None # The arrays as NumPy arrays, for _expandLayer.
+        self.lastVisited = 0
+
+    @classmethod
+    def fromArrays(cls, actors, movies, arrays):
+        """
+        Rebuilds the graph from its name tables and the arrays listed in Arrays,
+        e.g. memoryviews from a snapshot.
+        """
+        return cls(actors, movies, **arrays)
+
+    def _buildActorIndex(self) -> None:
+        """
+        Builds actorOffsets and actorMovies from the casts with a counting sort.
+        """
+        counts = array("i", [0]) * (len(self.actors) + 1)
+        for actorId in self.castActors:
+            counts[actorId + 1] += 1
+        for i in range(len(self.actors)):
+            counts[i + 1] += counts[i]
+        self.actorOffsets = array("i", counts)
+
+        self.actorMovies = array("i", [0]) * len(self.castActors)
+        castOffsets = self.castOffsets
+        for movieId in range(len(castOffsets) - 1):
+            for k in range(castOffsets[movieId], castOffsets[movieId + 1]):
+                actorId = self.castActors[k]
+                self.actorMovies[counts[actorId]] = movieId
+                counts[actorId] += 1
+
+    @classmethod
+    def fromMovies(cls, movieCasts):
+        """
+        Builds the graph from (movie, actors) pairs.
+
+        Parameters
+        ----------
+        movieCasts : iterable of tuple[str, list[str]]
+            The movie title and its cast, e.g. from readMovieFile.
+
+        Returns
+        -------
+        BipartiteGraph
+        """
+        actors = NameTable()
+        movies = NameTable()
+        castOffsets = array("i", [0])
+        castActors = array("i")
+        repeated = {}
+        for movie, cast in movieCasts:
+            castIds = [actors.intern(actor) for actor in cast]
+            if movie in movies: # A repeated title adds to its cast, see mergeCasts.
+                repeated.setdefault(movies.ids[movie], []).extend(castIds)
+                continue
+            movies.intern(movie)
+            castActors.extend(castIds)
+            castOffsets.append(len(castActors))
+        castOffsets, castActors = mergeCasts(castOffsets, castActors, repeated)
+        return cls(actors, movies, castOffsets, castActors)
+
+    @classmethod
+    def fromFile(cls, fileName):
+        """
+        Builds the graph from a movie data file.
+        """
+        return cls.fromMovies(readMovieFile(fileName))
+
+    @classmethod
+    def fromFiles(cls, fileNames, workers = None):
+        """
+        Builds the graph from one or more movie data files, see parseMovieFiles.
+        """
+        return parseMovieFiles(fileNames, workers)
+
+    def __len__(self) -> int:
+        return len(self.actors)
+
+    def __contains__(self, actor) -> bool:
+        return actor in self.actors
+
+    def iterMovies(self):
+        """
+        Yields (movie, actors) name pairs, like readMovieFile.
+        """
+        for movieId in range(len(self.castOffsets) - 1):
+            castIds = self.castActors[self.castOffsets[movieId]:self.castOffsets[movieId + 1]]
+            yield self.movies.names[movieId], [self.actors.names[i] for i in castIds]
+
+    def nbytes(self) -> int:
+        """
+        Returns the number of bytes used by the adjacency arrays.
+        """
+        return sum(a.itemsize * len(a) for a in map(self.__getattribute__, self.Arrays))
+
+    def edgeCount(self) -> int:
+        """
+        Returns the number of actor-movie edges.
+        """
+        return len(self.castActors)
+
+    def degrees(self) -> np.ndarray:
+        """
+        Returns the number of co-stars of every actor ID, see coStarDegrees.
+        """
+        return coStarDegrees(self.castOffsets, self.castActors, len(self.actors))
+
+    def neighbors(self, actor, excludeMovies = ()):
+        """
+        Yields (neighbor, movie) name pairs for an actor, like adjList[actor].items().
+        A co-star sharing several movies with the actor is yielded once, with
+        the first of them that is not in excludeMovies.
+        """
+        actorId = self.actors.ids[actor]
+        seen = {actorId}
+        for k in range(self.actorOffsets[actorId], self.actorOffsets[actorId + 1]):
+            movieId = self.actorMovies[k]
+            if excludeMovies and self.movies.names[movieId] in excludeMovies:
+                continue
+            for c in range(self.castOffsets[movieId], self.castOffsets[movieId + 1]):
+                costar = self.castActors[c]
+                if costar not in seen:
+                    seen.add(costar)
+                    yield self.actors.names[costar], self.movies.names[movieId]
+
+    _pathFromParents = CompactGraph._pathFromParents
+
+    def _numpyArrays(self):
+        """
+        Returns the actorOffsets, actorMovies, castOffsets and castActors arrays
+        as NumPy arrays, built on first use.
+        """
+        if self._arrays is None:
+            self._arrays = (np.asarray(self.actorOffsets, dtype = np.int64), np.asarray(self.actorMovies),
+                            np.asarray(self.castOffsets, dtype = np.int64), np.asarray(self.castActors))
+        return self._arrays
+
+    def _newExpanded(self):
+        """
+        Returns the per-search state of _expandLayer: a flag per movie, set once its cast is scanned.
+        """
+        return np.zeros(len(self.castOffsets) - 1, dtype = bool)
+
+    def _expandLayer(self, frontier, expanded):
+        """
+        Returns the (co-star ID, parent ID, movie ID) arrays of every co-star of
+        the actor IDs in frontier, scanning only the movies that this search has
+        not expanded yet, each from one of its actors in frontier.
+        """
+        actorOffsets, actorMovies, castOffsets, castActors = self._numpyArrays()
+        index, counts = csrPositions(actorOffsets, frontier)
+        movieIds, sources = actorMovies[index], np.repeat(frontier, counts)
+        new = ~expanded[movieIds]
+        movieIds, first = np.unique(movieIds[new], return_index = True)
+        sources = sources[new][first]
+        expanded[movieIds] = True
+        index, counts = csrPositions(castOffsets, movieIds)
+        return castActors[index], np.repeat(sources, counts), np.repeat(movieIds, counts)
+
+    _bidirectionalSearch = CompactGraph._bidirectionalSearch
+
+    def calcBaconNumber(self, startActor, endActor, bidirectional = True) -> list[int | list[str]]:
+        """
+        Calculates the Bacon number between two actors.
+
+        The BFS alternates between the actor layer and the movie layer: each
+        movie is expanded only once, so a large cast is scanned once instead of
+        once per actor in it.
+
+        Parameters
+        ----------
+        bidirectional : bool, optional
+            Search from both ends (default, see CompactGraph._bidirectionalSearch),
+            or only from startActor.
+
+        Returns
+        -------
+        List[int, List[str]]
+            The same result as BaconNumberCalculator.calcBaconNumber.
+        """
+        if startActor not in self.actors or endActor not in self.actors:
+            return [-1, []]
+        if startActor == endActor:
+            return [0, [startActor]]
+
+        startId = self.actors.ids[startActor]
+        endId = self.actors.ids[endActor]
+        if bidirectional:
+            return self._bidirectionalSearch(startId, endId)
+        actorOffsets, actorMovies = self.actorOffsets, self.actorMovies
+        castOffsets, castActors = self.castOffsets, self.castActors
+        parents = array("i", [-1]) * len(self.actors)
+        parentMovies = array("i", [0]) * len(self.actors)
+        movieVisited = bytearray(len(castOffsets) - 1)
+        parents[startId] = startId
+        visited = 1
+
+        queue = deque([startId])
+        while queue:
+            current = queue.popleft()
+            for k in range(actorOffsets[current], actorOffsets[current + 1]):
+                movieId = actorMovies[k]
+                if movieVisited[movieId]:
+                    continue
+                movieVisited[movieId] = 1
+                for c in range(castOffsets[movieId], castOffsets[movieId + 1]):
+                    costar = castActors[c]
+                    if parents[costar] == -1:
+                        parents[costar] = current
+                        visited += 1
+                        parentMovies[costar] = movieId
+                        if costar == endId:
+                            path = self._pathFromParents(endId, parents, parentMovies)
+                            self.lastVisited = visited
+                            return [(len(path) - 1) / 2, path]
+                        queue.append(costar)
+
+        self.lastVisited = visited
+        return [-1, []]
+
+    calcDistances = CompactGraph.calcDistances
+
+    def distanceArray(self, startId):
+        """
+        Calculates the Bacon number from startId to every actor ID, -1 if unreachable.
+        """
+        actorOffsets, actorMovies = self.actorOffsets, self.actorMovies
+        castOffsets, castActors = self.castOffsets, self.castActors
+        distances = array("i", [-1]) * len(self.actors)
+        movieVisited = bytearray(len(castOffsets) - 1)
+        distances[startId] = 0
+        queue = deque([startId])
+        while queue:
+            current = queue.popleft()
+            nextDist = distances[current] + 1
+            for k in range(actorOffsets[current], actorOffsets[current + 1]):
+                movieId = actorMovies[k]
+                if movieVisited[movieId]:
+                    continue
+                movieVisited[movieId] = 1
+                for c in range(castOffsets[movieId], castOffsets[movieId + 1]):
+                    costar = castActors[c]
+                    if distances[costar] == -1:
+                        distances[costar] = nextDist
+                        queue.append(costar)
+        return distances
+
+    def _constraintIds(self, excludeMovies, excludeActors):
+        """
+        Maps excluded movie titles and actor names to sets of IDs.
+        """
+        movieIds = {self.movies.ids[m] for m in excludeMovies if m in self.movies}
+        actorIds = {self.actors.ids[a] for a in excludeActors if a in self.actors}
+        return movieIds, actorIds
+
+    def calcBaconNumberConstrained(self, startActor, endActor, minYear = None, maxYear = None,
+                                   excludeMovies = (), excludeActors = ()) -> list[int | list[str]]:
+        """
+        Calculates the Bacon number using only the movies and actors that pass
+        the filters, checked per movie with movieYears during the BFS.
+        See BaconNumberCalculator.calcBaconNumberConstrained for the parameters.
+        """
+        if startActor not in self.actors or endActor not in self.actors:
+            return [-1, []]
+        inYears = yearFilter(minYear, maxYear)
+        movieIds, actorIds = self._constraintIds(excludeMovies, excludeActors)
+        startId = self.actors.ids[startActor]
+        endId = self.actors.ids[endActor]
+        if startId in actorIds or endId in actorIds:
+            return [-1, []]
+        if startId == endId:
+            return [0, [startActor]]
+
+        actorOffsets, actorMovies = self.actorOffsets, self.actorMovies
+        castOffsets, castActors, movieYears = self.castOffsets, self.castActors, self.movieYears
+        parents = array("i", [-1]) * len(self.actors)
+        parentMovies = array("i", [0]) * len(self.actors)
+        movieVisited = bytearray(len(castOffsets) - 1)
+        parents[startId] = startId
+        queue = deque([startId])
+        while queue:
+            current = queue.popleft()
+            for k in range(actorOffsets[current], actorOffsets[current + 1]):
+                movieId = actorMovies[k]
+                if movieVisited[movieId]:
+                    continue
+                movieVisited[movieId] = 1
+                if movieId in movieIds or (inYears is not None and not inYears(movieYears[movieId])):
+                    continue
+                for c in range(castOffsets[movieId], castOffsets[movieId + 1]):
+                    costar = castActors[c]
+                    if parents[costar] == -1 and costar not in actorIds:
+                        parents[costar] = current
+                        parentMovies[costar] = movieId
+                        if costar == endId:
+                            path = self._pathFromParents(endId, parents, parentMovies)
+                            return [(len(path) - 1) / 2, path]
+                        queue.append(costar)
+        return [-1, []]
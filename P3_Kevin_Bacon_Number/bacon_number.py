@@ -1,5 +1,12 @@
+import heapq
 import random
-from collections import deque
+import time
+from collections import deque, OrderedDict
+from bacon_graph import CompactGraph, BipartiteGraph, parseMovieFiles, parseYear, yearFilter
+from graph_snapshot import loadOrBuild
+from actor_index import ActorIndex
+from frontier_bfs import FrontierBFS
+from landmarks import LandmarkOracle
 random.seed(17)
 
 
@@ -9,12 +16,37 @@ class BaconNumberCalculator:
 
     Parameters
     ----------
-    fileName : str
-        The name of the file containing the movie data.
+    fileName : str or list of str
+        The name of the file(s) containing the movie data.
+    backend : str, optional
+        "dict" (default) builds adjList; "csr" builds a CompactGraph and
+        "bipartite" builds a BipartiteGraph instead.
+    cacheDir : str, optional
+        A directory to keep graph snapshots in (compact backends only).
+    workers : int, optional
+        The number of processes used to parse the data file(s).
 
     Attributes
     ----------
     adjList : dict of dict/dict of list/ dict of tuple/etc...
+    backend : str
+        The backend name, "dict" or one of the keys of Backends.
+    graph : CompactGraph, BipartiteGraph or None
+        The compact graph used instead of adjList when backend is not "dict".
+    fileName : str or list of str
+        The data file(s) the graph was read from.
+    cacheDir : str or None
+        The snapshot directory, also used for the landmarkOracle.
+    lastVisited : int
+        The number of actors visited by the last calcBaconNumber search.
+    treeCache : OrderedDict of str to dict
+        The most recently used BFS trees, see calcBaconNumbers.
+    version : int
+        A counter that changes whenever the graph changes, used to key cached results.
+    movieCasts : dict of str to list of str
+        The cast of every movie in adjList (dict backend only).
+    movieYears : dict of str to int
+        The release year of every movie in adjList, 0 if unknown (dict backend only).
 
     Methods
     -------
@@ -24,32 +56,121 @@ class BaconNumberCalculator:
     calcBaconNumber(startActor, endActor)
         Calculates the Bacon number between two actors.
     
-    calcAvgNumber(startActor, threshold)
-        Calculates the average Bacon number for a given actor.
+    calcAvgNumber(startActor, threshold, mode)
+        Calculates the average Bacon number for a given actor, by sampling or exactly.
     """
 
-    def __init__(self, fileName) -> None:
+    # The number of BFS trees kept in treeCache.
+    TreeCacheSize = 16
+
+    Backends = {
+        "csr": CompactGraph,
+        "bipartite": BipartiteGraph,
+    }
+
+    def __init__(self, fileName, backend = "dict", cacheDir = None, workers = None) -> None:
         """
         Constructs all the necessary attributes for the BaconNumberCalculator object.
 
         Parameters
         ----------
-        fileName : str
-            The name of the file containing the movie data.
+        fileName : str or list of str
+            The name of the file(s) containing the movie data.
+        backend : str, optional
+            "dict" (default) or one of the keys of Backends.
+        cacheDir : str, optional
+            If given, the compact graph is loaded from a memory-mapped snapshot
+            in this directory. The snapshot is keyed by the path, mtime and size
+            of fileName, and rebuilt only when the file changes.
+        workers : int, optional
+            If given, the file(s) are split into shards and parsed by this many
+            processes, see bacon_graph.parseMovieFiles.
         """
+        if backend == "dict" and cacheDir is not None:
+            raise ValueError("Snapshots need a compact backend, not dict")
         self.adjList = {}
-        self.generateAdjList(fileName)
+        self.movieCasts = {}
+        self.movieYears = {}
+        self._actorMovies = None
+        self._nameIndex = None
+        self._frontier = None
+        self._landmarks = None
+        self.fileName = fileName
+        self.cacheDir = cacheDir
+        self.backend = backend
+        self.graph = None
+        self.lastVisited = 0
+        self.treeCache = OrderedDict()
+        self.version = 0
+        if backend == "dict":
+            self.generateAdjList(fileName, workers)
+        elif backend not in self.Backends:
+            raise ValueError(f"Unknown backend: {backend}")
+        elif cacheDir is None:
+            self.graph = self.Backends[backend].fromFiles(fileName, workers)
+        else:
+            graphClass = self.Backends[backend]
+            self.graph = loadOrBuild(fileName, graphClass, backend, cacheDir,
+                                     lambda: graphClass.fromFiles(fileName, workers))
+
+    def _hasActor(self, actor) -> bool:
+        """
+        Checks if the actor is in the graph, whichever backend is used.
+        """
+        if self.graph is not None:
+            return actor in self.graph
+        return actor in self.adjList
+
+    def _neighbors(self, actor, excludeMovies = ()):
+        """
+        Returns the (neighbor, movie) pairs of an actor, whichever backend is used.
 
-    def generateAdjList(self, fileName) -> None:
+        With excludeMovies, the co-stars are found through the movies of the
+        actor instead of the one movie kept per pair, so a co-star who also
+        shares a movie that is not excluded is still a neighbor.
+        """
+        if self.graph is not None:
+            return self.graph.neighbors(actor, excludeMovies)
+        if excludeMovies:
+            return self._castNeighbors(actor, excludeMovies)
+        return self.adjList[actor].items()
+
+    def _castNeighbors(self, actor, excludeMovies):
+        """
+        Yields the (co-star, movie) pairs of an actor from movieCasts, each co-star
+        once, skipping the movies in excludeMovies.
+        """
+        seen = {actor}
+        for movie in self._getActorMovies()[actor]:
+            if movie in excludeMovies:
+                continue
+            for costar in self.movieCasts[movie]:
+                if costar not in seen:
+                    seen.add(costar)
+                    yield costar, movie
+
+    def _actors(self) -> list[str]:
+        """
+        Returns the list of all actors in the graph, whichever backend is used.
+        """
+        if self.graph is not None:
+            return list(self.graph.actors.names)
+        return list(self.adjList.keys())
+
+    def generateAdjList(self, fileName, workers = None) -> None:
         """
         Reads a file and builds an adjacency list representing actor connections.
 
         Parameters
         ----------
-        fileName : str
+        fileName : str or list of str
             The name of the file to read the movie data from.
             You need to think about which encoding you should use,
             To load the file.
+            Several files can be given to build one graph from all of them.
+        workers : int, optional
+            If given, the file(s) are parsed in parallel by this many processes
+            (see bacon_graph.parseMovieFiles) and the casts are merged here.
 
 
         
@@ -91,6 +212,11 @@ class BaconNumberCalculator:
         None
         """
         # Method implementation...
+        if workers is not None or not isinstance(fileName, str):
+            for movie, actors in parseMovieFiles(fileName, workers).iterMovies():
+                self._addCast(movie, actors)
+            return
+
         f = open(fileName, mode = "r", encoding='ISO-8859-1')
         
         for line in f:
@@ -100,24 +226,233 @@ class BaconNumberCalculator:
             components = line.strip().split("/")
             movie = components[0].strip()
             actors = components[1:]
-            
-            for i in range(len(actors)):
-                actor1 = actors[i]
-                if actors[i] not in self.adjList:
-                    self.adjList[actor1] = {}
-                for j in range(i+1, len(actors)):
-                    actor2 = actors[j]
-                    if actor2 not in self.adjList:
-                        self.adjList[actor2] = {}
-                    
-                    if actor2 not in self.adjList[actor1]:
-                        self.adjList[actor1][actor2] = movie
-                    
-                    if actor1 not in self.adjList[actor2]:
-                        self.adjList[actor2][actor1] = movie
+            self._addCast(movie, actors)
             
         f.close()
 
+    def _addCast(self, movie, actors) -> None:
+        """
+        Connects every pair of actors in a movie in adjList.
+        A pair that is already connected keeps its first movie.
+        A title seen before is the same movie: its new actors join the cast
+        and are connected to all of it (see bacon_graph.mergeCasts).
+        An actor listed twice in a cast is one cast member, so no actor
+        becomes its own co-star.
+        """
+        actors = list(dict.fromkeys(actors))
+        known = 0
+        if movie in self.movieCasts:
+            cast = self.movieCasts[movie]
+            known = len(cast)
+            cast.extend(actor for actor in actors if actor not in cast)
+            actors = cast
+        else:
+            self.movieCasts[movie] = list(actors)
+            self.movieYears[movie] = parseYear(movie)
+        if self._actorMovies is not None:
+            for actor in actors[known:]:
+                self._actorMovies.setdefault(actor, set()).add(movie)
+
+        for i in range(len(actors)):
+            actor1 = actors[i]
+            if actors[i] not in self.adjList:
+                self.adjList[actor1] = {}
+            for j in range(max(i+1, known), len(actors)): # Pairs of known actors are connected already.
+                actor2 = actors[j]
+                if actor2 not in self.adjList:
+                    self.adjList[actor2] = {}
+                
+                if actor2 not in self.adjList[actor1]:
+                    self.adjList[actor1][actor2] = movie
+                
+                if actor1 not in self.adjList[actor2]:
+                    self.adjList[actor2][actor1] = movie
+
+    def _getActorMovies(self) -> dict[str, set[str]]:
+        """
+        Returns the movies of every actor, building the index from movieCasts on first use.
+        """
+        if self._actorMovies is None:
+            self._actorMovies = {}
+            for movie, cast in self.movieCasts.items():
+                for actor in cast:
+                    self._actorMovies.setdefault(actor, set()).add(movie)
+        return self._actorMovies
+
+    def _checkMutable(self) -> None:
+        if self.graph is not None:
+            raise ValueError(f"Incremental updates need the dict backend, not {self.backend}")
+
+    def addMovie(self, title, cast) -> None:
+        """
+        Adds a movie to the graph without rebuilding it.
+
+        Only the cached BFS trees that reach one of the cast members are
+        dropped; the others cannot get shorter paths from the new edges.
+
+        Parameters
+        ----------
+        title : str
+            The movie title, which must not be in the graph yet.
+        cast : list of str
+            The actors in the movie.
+
+        Raises
+        ------
+        ValueError
+            If the movie is already in the graph, or the backend is not dict.
+        """
+        self._checkMutable()
+        if title in self.movieCasts:
+            raise ValueError(f"Movie already in graph: {title}")
+
+        for source, previousPath in list(self.treeCache.items()):
+            if any(actor in previousPath for actor in cast):
+                del self.treeCache[source]
+        if self._nameIndex is not None:
+            for actor in set(cast):
+                if actor not in self.adjList:
+                    self._nameIndex.add(actor)
+        self._addCast(title, cast)
+        self.version += 1
+
+    def removeMovie(self, title) -> None:
+        """
+        Removes a movie from the graph without rebuilding it.
+
+        An edge labelled with the movie is relabelled with another movie the
+        two actors share, or removed if there is none. Actors left without
+        any movie are removed. Only the cached BFS trees that use an edge
+        labelled with the movie are dropped.
+
+        Parameters
+        ----------
+        title : str
+            The movie title.
+
+        Raises
+        ------
+        KeyError
+            If the movie is not in the graph.
+        ValueError
+            If the backend is not dict.
+        """
+        self._checkMutable()
+        if title not in self.movieCasts: # Checked first, so a failed call changes nothing.
+            raise KeyError(title)
+        actorMovies = self._getActorMovies()
+        # A name listed twice is one cast member; the pair (A, A) is never an edge.
+        cast = list(dict.fromkeys(self.movieCasts.pop(title)))
+        del self.movieYears[title]
+        for actor in cast:
+            actorMovies[actor].discard(title)
+
+        for i in range(len(cast)):
+            actor1 = cast[i]
+            for j in range(i+1, len(cast)):
+                actor2 = cast[j]
+                if self.adjList[actor1].get(actor2) != title:
+                    continue
+                shared = actorMovies[actor1] & actorMovies[actor2]
+                if shared:
+                    movie = next(iter(shared))
+                    self.adjList[actor1][actor2] = movie
+                    self.adjList[actor2][actor1] = movie
+                else:
+                    del self.adjList[actor1][actor2]
+                    del self.adjList[actor2][actor1]
+        for actor in cast:
+            if actor in actorMovies and not actorMovies[actor]:
+                del actorMovies[actor]
+                del self.adjList[actor]
+                self._nameIndex = None # Rebuilt on the next lookup.
+
+        for source, previousPath in list(self.treeCache.items()):
+            if source not in self.adjList or any(
+                    step is not None and step[1] == title for step in previousPath.values()):
+                del self.treeCache[source]
+        self.version += 1
+
+    def nameIndex(self) -> ActorIndex:
+        """
+        Returns the ActorIndex over all actor names, building it on first use.
+        """
+        if self._nameIndex is None:
+            self._nameIndex = ActorIndex(self._actors())
+        return self._nameIndex
+
+    def frontierSearch(self) -> FrontierBFS:
+        """
+        Returns the vectorized FrontierBFS over the current graph, rebuilding it after a change.
+        """
+        if self._frontier is None or self._frontier[0] != self.version:
+            if self.graph is not None:
+                search = FrontierBFS.fromGraph(self.graph)
+            else:
+                search = FrontierBFS.fromMovies(self.movieCasts.items())
+            self._frontier = (self.version, search)
+        return self._frontier[1]
+
+    def landmarkOracle(self, count = 16, cacheDir = None) -> LandmarkOracle:
+        """
+        Returns the LandmarkOracle over the current graph, building it on first use.
+
+        Parameters
+        ----------
+        count : int, optional
+            The number of landmarks.
+        cacheDir : str, optional
+            The directory to keep the oracle in, next to the graph snapshots.
+            Default is the cacheDir of the calculator. The saved oracle is
+            keyed by the data files and the backend (whose actor IDs its rows
+            use) like a snapshot, and only used while the graph is unchanged
+            by addMovie/removeMovie.
+        """
+        if cacheDir is None:
+            cacheDir = self.cacheDir
+        key = (self.version, count)
+        if self._landmarks is None or self._landmarks[0] != key:
+            build = lambda: LandmarkOracle.build(self.frontierSearch(), count)
+            if cacheDir is not None and self.version == 0:
+                oracle = loadOrBuild(self.fileName, LandmarkOracle, f"landmarks{count}.{self.backend}",
+                                     cacheDir, build)
+            else:
+                oracle = build()
+            self._landmarks = (key, oracle)
+        return self._landmarks[1]
+
+    def estimateBaconNumber(self, startActor, endActor) -> tuple[int, float]:
+        """
+        Bounds the Bacon number between two actors from the landmark distances, without a search.
+
+        Returns
+        -------
+        tuple[int, float]
+            (lower, upper), see LandmarkOracle.bounds.
+        """
+        return self.landmarkOracle().bounds(startActor, endActor)
+
+    def findActors(self, query, limit = 10) -> list[str]:
+        """
+        Resolves a partial or misspelled name to candidate actors.
+
+        Parameters
+        ----------
+        query : str
+            E.g. "Bacon, K", "kevin bacon" or "Bacn, Kevn".
+        limit : int, optional
+            The maximum number of candidates.
+
+        Returns
+        -------
+        list of str
+            The candidate actor names, as used by calcBaconNumber.
+            An exact match is always first.
+        """
+        if self._hasActor(query):
+            return [query] + [name for name in self.nameIndex().search(query, limit) if name != query][:limit - 1]
+        return self.nameIndex().search(query, limit)
+
     def _reconstructPath(self, startActor, endActor, previousPath):
         """
         Reconstruct the path from startActor to endActor. 
@@ -152,7 +487,7 @@ class BaconNumberCalculator:
         return [baconNumber, path]
         
 
-    def calcBaconNumber(self, startActor, endActor) -> list[int | list[str]]:
+    def calcBaconNumber(self, startActor, endActor, bidirectional = True, landmarks = False) -> list[int | list[str]]:
         """
         Calculates the Bacon number (shortest path) between two actors.
 
@@ -162,6 +497,12 @@ class BaconNumberCalculator:
             The name of the starting actor.
         endActor : str
             The name of the ending actor.
+        bidirectional : bool, optional
+            Use the bidirectional search (default), or the one-sided BFS if False,
+            with every backend.
+        landmarks : bool, optional
+            Prune the bidirectional search with the bounds of landmarkOracle.
+            Unreachable pairs are answered without a search.
 
         Returns
         -------
@@ -207,11 +548,23 @@ class BaconNumberCalculator:
         """
 
         # Method implementation...
+        if landmarks:
+            oracle = self.landmarkOracle()
+            result = oracle.calcBaconNumber(startActor, endActor, self._neighbors)
+            self.lastVisited = oracle.lastVisited
+            return result
+        if self.graph is not None:
+            result = self.graph.calcBaconNumber(startActor, endActor, bidirectional)
+            self.lastVisited = self.graph.lastVisited
+            return result
+
         # If one of the inputted actor in not in our graph. 
         if startActor not in self.adjList or endActor not in self.adjList:
             return [-1, []]
         if startActor == endActor: # If the starter actor is the end actor. 
             return [0, [startActor]]
+        if bidirectional:
+            return self._bidirectionalSearch(startActor, endActor)
         
         # Create a queue for BFS with only actor stored. 
         queue = deque([startActor])
@@ -231,14 +584,479 @@ class BaconNumberCalculator:
                     previousPass[neighbor] = (current, movie)
                     
                     if neighbor == endActor:
+                        self.lastVisited = len(visited)
                         return self._reconstructPath(startActor, endActor, previousPass)
         
+        self.lastVisited = len(visited)
         return [-1, []]
+
+    def _bidirectionalSearch(self, startActor, endActor) -> list[int | list[str]]:
+        """
+        Finds the shortest path with a BFS from both ends that meets in the middle.
+
+        Each round expands one whole layer of the smaller frontier. Every neighbor
+        that the other side has already reached closes a path, and the shortest
+        one found in the layer is kept. The backward half is then copied into the
+        forward previousPath so _reconstructPath can build the result.
+
+        Parameters
+        ----------
+        startActor : str
+            The name of the starting actor.
+        endActor : str
+            The name of the ending actor.
+
+        Returns
+        -------
+        List[int, List[str]]
+            The same result as calcBaconNumber.
+        """
+        # previousPath[actor] = (actor before it, movie), from startActor.
+        # nextPath[actor] = (actor after it, movie), towards endActor.
+        previousPath = {startActor: None}
+        nextPath = {endActor: None}
+        forwardDist = {startActor: 0}
+        backwardDist = {endActor: 0}
+        forwardFrontier = [startActor]
+        backwardFrontier = [endActor]
+
+        meet = None
+        while forwardFrontier and backwardFrontier and meet is None:
+            forward = len(forwardFrontier) <= len(backwardFrontier)
+            if forward:
+                frontier, parents, dist, otherDist = forwardFrontier, previousPath, forwardDist, backwardDist
+            else:
+                frontier, parents, dist, otherDist = backwardFrontier, nextPath, backwardDist, forwardDist
+
+            best = None
+            newFrontier = []
+            for current in frontier:
+                for neighbor, movie in self.adjList[current].items():
+                    if neighbor in dist:
+                        continue
+                    parents[neighbor] = (current, movie)
+                    dist[neighbor] = dist[current] + 1
+                    newFrontier.append(neighbor)
+                    if neighbor in otherDist:
+                        length = dist[neighbor] + otherDist[neighbor]
+                        if best is None or length < best:
+                            best, meet = length, neighbor
+
+            if forward:
+                forwardFrontier = newFrontier
+            else:
+                backwardFrontier = newFrontier
+
+        self.lastVisited = len(forwardDist) + len(backwardDist)
+        if meet is None:
+            return [-1, []]
+
+        # Copy the backward half: meet -> ... -> endActor.
+        current = meet
+        while current != endActor:
+            nextActor, movie = nextPath[current]
+            previousPath[nextActor] = (current, movie)
+            current = nextActor
+        return self._reconstructPath(startActor, endActor, previousPath)
                     
 
-    def calcAvgNumber(self, startActor, threshold) -> float:
+    def _bfsTree(self, startActor) -> dict[str, tuple[str, str]]:
+        """
+        Returns the BFS tree of startActor, from treeCache if it is there.
+
+        Parameters
+        ----------
+        startActor : str
+            The root of the tree, which must be in our graph.
+
+        Returns
+        -------
+        dict of str to tuple
+            The previousPath of every actor reachable from startActor, as used
+            by _reconstructPath. startActor itself maps to None.
+        """
+        if startActor in self.treeCache:
+            self.treeCache.move_to_end(startActor)
+            return self.treeCache[startActor]
+
+        previousPath = {startActor: None}
+        queue = deque([startActor])
+        while queue:
+            current = queue.popleft()
+            for neighbor, movie in self._neighbors(current):
+                if neighbor not in previousPath:
+                    previousPath[neighbor] = (current, movie)
+                    queue.append(neighbor)
+
+        self.treeCache[startActor] = previousPath
+        if len(self.treeCache) > self.TreeCacheSize:
+            self.treeCache.popitem(last = False) # Drop the least recently used tree.
+        return previousPath
+
+    def calcBaconNumbers(self, queries) -> list[list[int | list[str]]]:
+        """
+        Calculates the Bacon numbers of many (startActor, endActor) queries.
+
+        The queries are grouped by startActor, and each distinct startActor
+        gets one full BFS tree that answers all of its queries. The trees of
+        recent startActors are kept in treeCache, so a repeated startActor
+        only costs a path walk-back.
+
+        Parameters
+        ----------
+        queries : iterable of tuple[str, str]
+            The (startActor, endActor) pairs.
+
+        Returns
+        -------
+        list of List[int, List[str]]
+            The result of every query in the given order, in the same form
+            as calcBaconNumber.
         """
-        Calculates the average Bacon number for a given actor until convergence.
+        queries = list(queries)
+        groups = {}
+        for i, (startActor, endActor) in enumerate(queries):
+            groups.setdefault(startActor, []).append(i)
+
+        results = [None] * len(queries)
+        for startActor, indices in groups.items():
+            if not self._hasActor(startActor):
+                for i in indices:
+                    results[i] = [-1, []]
+                continue
+            previousPath = self._bfsTree(startActor)
+            for i in indices:
+                endActor = queries[i][1]
+                if endActor == startActor:
+                    results[i] = [0, [startActor]]
+                elif endActor in previousPath:
+                    results[i] = self._reconstructPath(startActor, endActor, previousPath)
+                else:
+                    results[i] = [-1, []]
+        return results
+
+    def _filteredSearch(self, startActor, endActor, allowEdge, excludeMovies = ()) -> list[str] | None:
+        """
+        Finds a shortest path using only the edges that allowEdge accepts.
+
+        Parameters
+        ----------
+        startActor : str
+            The name of the starting actor.
+        endActor : str
+            The name of the ending actor.
+        allowEdge : callable
+            allowEdge(actor, neighbor, movie) -> bool, checked during the BFS,
+            so the graph itself is never copied.
+        excludeMovies : set of str, optional
+            Movies that may not be used, see _neighbors.
+
+        Returns
+        -------
+        List[str] or None
+            The path [startActor, movie1, actor2, ..., endActor], or None if
+            there is no path.
+        """
+        if startActor == endActor:
+            return [startActor]
+        previousPath = {startActor: None}
+        queue = deque([startActor])
+        while queue:
+            current = queue.popleft()
+            for neighbor, movie in self._neighbors(current, excludeMovies):
+                if neighbor in previousPath or not allowEdge(current, neighbor, movie):
+                    continue
+                previousPath[neighbor] = (current, movie)
+                if neighbor == endActor:
+                    return self._reconstructPath(startActor, endActor, previousPath)[1]
+                queue.append(neighbor)
+        return None
+
+    def calcBaconNumberConstrained(self, startActor, endActor, minYear = None, maxYear = None,
+                                   excludeMovies = (), excludeActors = ()) -> list[int | list[str]]:
+        """
+        Calculates the Bacon number using only some of the movies and actors.
+
+        The filters are checked during the BFS, so the graph is never copied.
+        The BFS expands the movies of each actor (from movieCasts, or the casts
+        of a compact graph), so two actors who share several movies stay
+        connected as long as one of those movies passes the filters, whichever
+        backend is used.
+
+        Parameters
+        ----------
+        startActor : str
+            The name of the starting actor.
+        endActor : str
+            The name of the ending actor.
+        minYear, maxYear : int, optional
+            Only use movies released in [minYear, maxYear]. A movie whose title
+            has no year is not used when either bound is given.
+        excludeMovies : iterable of str, optional
+            Movie titles that may not be used.
+        excludeActors : iterable of str, optional
+            Actors that may not be on the path.
+
+        Returns
+        -------
+        List[int, List[str]]
+            The same form as calcBaconNumber; [-1, []] if there is no such path.
+        """
+        excludeMovies = set(excludeMovies)
+        excludeActors = set(excludeActors)
+        if self.graph is not None:
+            return self.graph.calcBaconNumberConstrained(startActor, endActor, minYear, maxYear,
+                                                         excludeMovies, excludeActors)
+        if startActor not in self.adjList or endActor not in self.adjList:
+            return [-1, []]
+        if startActor in excludeActors or endActor in excludeActors:
+            return [-1, []]
+        if startActor == endActor:
+            return [0, [startActor]]
+
+        inYears = yearFilter(minYear, maxYear)
+        actorMovies = self._getActorMovies()
+        previousPath = {startActor: None}
+        visitedMovies = set()
+        queue = deque([startActor])
+        while queue:
+            current = queue.popleft()
+            for movie in actorMovies[current]:
+                if movie in visitedMovies:
+                    continue
+                visitedMovies.add(movie)
+                if movie in excludeMovies or (inYears is not None and not inYears(self.movieYears[movie])):
+                    continue
+                for costar in self.movieCasts[movie]:
+                    if costar in previousPath or costar in excludeActors:
+                        continue
+                    previousPath[costar] = (current, movie)
+                    if costar == endActor:
+                        return self._reconstructPath(startActor, endActor, previousPath)
+                    queue.append(costar)
+        return [-1, []]
+
+    def iterShortestPaths(self, startActor, endActor):
+        """
+        Lazily yields every shortest path between two actors.
+
+        One BFS builds the predecessor DAG: every actor up to the distance of
+        endActor, with all of its neighbors one layer closer to startActor.
+        The paths are then walked back from endActor one at a time, so a
+        caller that stops early does not pay for the rest.
+
+        Parameters
+        ----------
+        startActor : str
+            The name of the starting actor.
+        endActor : str
+            The name of the ending actor.
+
+        Yields
+        ------
+        List[str]
+            [startActor, movie1, actor2, movie2, ..., endActor]
+        """
+        if not self._hasActor(startActor) or not self._hasActor(endActor):
+            return
+        if startActor == endActor:
+            yield [startActor]
+            return
+
+        distances = {startActor: 0}
+        predecessors = {startActor: []}
+        queue = deque([startActor])
+        while queue:
+            current = queue.popleft()
+            if endActor in distances and distances[current] >= distances[endActor]:
+                break # Every actor left is at least as far as endActor.
+            nextDist = distances[current] + 1
+            for neighbor, movie in self._neighbors(current):
+                if neighbor not in distances:
+                    distances[neighbor] = nextDist
+                    predecessors[neighbor] = [(current, movie)]
+                    queue.append(neighbor)
+                elif distances[neighbor] == nextDist:
+                    predecessors[neighbor].append((current, movie))
+        if endActor not in distances:
+            return
+
+        # Depth-first walk from endActor over the DAG; each stack entry is a
+        # partial path from some actor to endActor, reversed.
+        stack = [[endActor]]
+        while stack:
+            partial = stack.pop()
+            actor = partial[-1]
+            if actor == startActor:
+                yield partial[::-1]
+                continue
+            for previous, movie in reversed(predecessors[actor]):
+                stack.append(partial + [movie, previous])
+
+    def iterKShortestPaths(self, startActor, endActor, k = None, excludeMovies = ()):
+        """
+        Lazily yields loopless paths between two actors, shortest first (Yen's algorithm).
+
+        Parameters
+        ----------
+        startActor : str
+            The name of the starting actor.
+        endActor : str
+            The name of the ending actor.
+        k : int, optional
+            The maximum number of paths. None yields until there are no more.
+        excludeMovies : iterable of str, optional
+            Movies that may not be used, e.g. to find a path that avoids one
+            particular movie. Two actors who also share another movie stay
+            connected through it.
+
+        Yields
+        ------
+        List[str]
+            [startActor, movie1, actor2, movie2, ..., endActor]
+        """
+        if not self._hasActor(startActor) or not self._hasActor(endActor):
+            return
+        excludeMovies = set(excludeMovies)
+
+        def search(spurActor, bannedActors, bannedEdges):
+            return self._filteredSearch(spurActor, endActor, lambda actor, neighbor, movie:
+                                        neighbor not in bannedActors
+                                        and (actor, neighbor) not in bannedEdges, excludeMovies)
+
+        path = search(startActor, set(), set())
+        found = []
+        candidates = []
+        seen = set()
+        while path is not None and (k is None or len(found) < k):
+            found.append(path)
+            yield path
+            if len(path) == 1:
+                return
+            # Every prefix of the last path ending at an actor is a root;
+            # deviate from it at its last actor (the spur).
+            for i in range(0, len(path) - 1, 2):
+                root = path[:i + 1]
+                bannedEdges = {(p[i], p[i + 2]) for p in found
+                               if len(p) > i + 2 and p[:i + 1] == root}
+                bannedActors = set(root[:-1:2])
+                spur = search(root[-1], bannedActors, bannedEdges)
+                if spur is not None:
+                    candidate = root[:-1] + spur
+                    key = tuple(candidate)
+                    if key not in seen:
+                        seen.add(key)
+                        heapq.heappush(candidates, (len(candidate), key))
+            path = list(heapq.heappop(candidates)[1]) if candidates else None
+
+    def calcDistances(self, startActor, vectorized = False) -> dict[str, int]:
+        """
+        Calculates the Bacon number from startActor to every reachable actor with one BFS.
+
+        Parameters
+        ----------
+        startActor : str
+            The name of the starting actor.
+        vectorized : bool, optional
+            Run the BFS layer by layer with NumPy (see frontierSearch) instead
+            of actor by actor. Much faster on large graphs, same result.
+
+        Returns
+        -------
+        dict of str to int
+            The Bacon number of every actor reachable from startActor,
+            including startActor itself with 0. Empty if startActor is not in our graph.
+        """
+        if vectorized:
+            return self.frontierSearch().calcDistances(startActor)
+        if self.graph is not None:
+            return self.graph.calcDistances(startActor)
+        if startActor not in self.adjList:
+            return {}
+
+        distances = {startActor: 0}
+        queue = deque([startActor])
+        while queue:
+            current = queue.popleft()
+            nextDist = distances[current] + 1
+            for neighbor in self.adjList[current]:
+                if neighbor not in distances:
+                    distances[neighbor] = nextDist
+                    queue.append(neighbor)
+        return distances
+
+    def calcAvgNumber(self, startActor, threshold = 0.01, mode = "sample", vectorized = False) -> float:
+        """
+        Calculates the average Bacon number for a given actor.
+
+        In "sample" mode (default, so calcAvgNumber(actor, threshold) keeps its
+        meaning), the average is estimated by random sampling, see _sampleAvgNumber.
+        In "exact" mode, one BFS from startActor gives the Bacon number of
+        every reachable actor, and the result is their exact mean, in O(V+E).
+
+        Parameters
+        ----------
+        startActor : str
+            The actor for whom the average Bacon number is to be calculated.
+        threshold : float, optional
+            The convergence threshold for the "sample" mode.
+        mode : str, optional
+            "exact" or "sample".
+        vectorized : bool, optional
+            In "exact" mode, run the BFS with NumPy, see calcDistances.
+
+        Returns
+        -------
+        float
+            The average Bacon number for the startActor, over all other reachable actors.
+            -1 if startActor is not in our graph.
+        """
+        if mode == "exact":
+            return self._exactAvgNumber(startActor, vectorized)
+        if mode == "sample":
+            return self._sampleAvgNumber(startActor, threshold)
+        raise ValueError(f"Unknown mode: {mode}")
+
+    def _exactAvgNumber(self, startActor, vectorized = False) -> float:
+        """
+        Calculates the exact mean Bacon number from startActor to every other reachable actor.
+        """
+        if not self._hasActor(startActor):
+            return -1
+        if vectorized:
+            reached, total = self.frontierSearch().distanceSum(startActor)
+            return total / reached if reached else 0
+        distances = self.calcDistances(startActor)
+        if len(distances) == 1: # No one else is reachable.
+            return 0
+        return sum(distances.values()) / (len(distances) - 1)
+
+    def benchmarkAvgNumber(self, startActor, threshold = 0.01) -> dict[str, dict[str, float]]:
+        """
+        Runs calcAvgNumber in both modes and compares their results and running times.
+
+        Parameters
+        ----------
+        startActor : str
+            The actor for whom the average Bacon number is to be calculated.
+        threshold : float, optional
+            The convergence threshold for the "sample" mode.
+
+        Returns
+        -------
+        dict
+            {"exact": {"avg": ..., "seconds": ...}, "sample": {"avg": ..., "seconds": ...}}
+        """
+        results = {}
+        for mode in ["exact", "sample"]:
+            start = time.perf_counter()
+            avg = self.calcAvgNumber(startActor, threshold, mode)
+            results[mode] = {"avg": avg, "seconds": time.perf_counter() - start}
+        return results
+
+    def _sampleAvgNumber(self, startActor, threshold) -> float:
+        """
+        Estimates the average Bacon number for a given actor until convergence.
 
         The method iteratively selects a random actor and computes the Bacon number 
         from the startActor to this random actor. It updates and calculates the 
@@ -272,15 +1090,17 @@ class BaconNumberCalculator:
             The converged average Bacon number for the startActor.
         """
         # Method implementation...
-        if startActor not in self.adjList:
+        if not self._hasActor(startActor):
             return -1
+        if next(iter(self._neighbors(startActor)), None) is None:
+            return 0 # No valid sample exists, the loop below would never end.
         
         # Initialize 
         previousAvg = 0 
         currentAvg = 0
         curDiff = float("inf")
         
-        actors = list(self.adjList.keys())
+        actors = self._actors()
         roundCount = 0
         totalBNum = 0
         
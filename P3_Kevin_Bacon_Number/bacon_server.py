@@ -0,0 +1,315 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from urllib.parse import urlsplit, parse_qs, urlencode
+from bacon_number import BaconNumberCalculator
+
+# The calculator the queries run on. Threads share the server's calculator;
+# each worker process loads its own copy in _initWorker.
+_calculator = None
+
+
+def _initWorker(fileName, backend, cacheDir) -> None:
+    global _calculator
+    _calculator = BaconNumberCalculator(fileName, backend, cacheDir)
+
+
+def _runQuery(kind, startActor, endActor = None):
+    """
+    Runs one query on _calculator and returns its JSON-ready result.
+    """
+    if kind == "bacon":
+        baconNumber, path = _calculator.calcBaconNumber(startActor, endActor)
+        return {"from": startActor, "to": endActor, "baconNumber": baconNumber, "path": path}
+    return {"from": startActor, "avg": _calculator.calcAvgNumber(startActor, mode = "exact")}
+
+
+def percentile(values, q) -> float:
+    """
+    Returns the q-th percentile (0 to 100) of values, by the nearest-rank method.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100)) # ceil(len * q / 100)
+    return ordered[int(rank) - 1]
+
+
+class BaconServer:
+    """
+    A small HTTP/JSON server that answers Bacon number queries from a graph
+    that is loaded once and kept in memory.
+
+    Endpoints
+    ---------
+    GET /bacon?from=A&to=B
+        {"from": A, "to": B, "baconNumber": ..., "path": [...]}
+    GET /avg?from=A
+        {"from": A, "avg": ...}
+
+    A query that fails (e.g. in a broken process pool) is answered with
+    500 and {"error": ...}, and the connection stays open.
+
+    The searches run in a thread or process pool so the event loop keeps
+    serving other connections. Results are kept in an LRU cache keyed by the
+    query and the graph version, and concurrent identical queries share one
+    search.
+
+    Parameters
+    ----------
+    fileName : str or list of str
+        The movie data file(s).
+    backend : str, optional
+        The BaconNumberCalculator backend.
+    cacheDir : str, optional
+        The snapshot directory, see BaconNumberCalculator.
+    workers : int, optional
+        The size of the thread or process pool.
+    useProcesses : bool, optional
+        Use a process pool (each worker loads the graph once) instead of threads.
+    cacheSize : int, optional
+        The number of results kept in the result cache.
+    """
+
+    def __init__(self, fileName, backend = "dict", cacheDir = None, workers = 4,
+                 useProcesses = False, cacheSize = 4096) -> None:
+        global _calculator
+        self.calculator = BaconNumberCalculator(fileName, backend, cacheDir)
+        _calculator = self.calculator
+        if useProcesses:
+            # Spawned, not forked, workers: a forked worker would inherit the
+            # listening and client sockets and keep them open.
+            self.executor = ProcessPoolExecutor(max_workers = workers, initializer = _initWorker,
+                                                initargs = (fileName, backend, cacheDir),
+                                                mp_context = multiprocessing.get_context("spawn"))
+        else:
+            self.executor = ThreadPoolExecutor(max_workers = workers)
+        self.cacheSize = cacheSize
+        self.results = OrderedDict()
+        self.pending = {}
+        self.connections = set()
+        self.server = None
+
+    async def query(self, kind, startActor, endActor = None):
+        """
+        Answers a query from the result cache, or runs it in the pool.
+        """
+        key = (self.calculator.version, kind, startActor, endActor)
+        if key in self.results:
+            self.results.move_to_end(key)
+            return self.results[key]
+        if key not in self.pending:
+            loop = asyncio.get_running_loop()
+            self.pending[key] = loop.run_in_executor(self.executor, _runQuery, kind, startActor, endActor)
+        try:
+            result = await asyncio.shield(self.pending[key])
+        finally:
+            self.pending.pop(key, None)
+        self.results[key] = result
+        if len(self.results) > self.cacheSize:
+            self.results.popitem(last = False)
+        return result
+
+    async def route(self, target):
+        """
+        Returns (status, body) for a request target such as "/bacon?from=A&to=B".
+        """
+        url = urlsplit(target)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        if url.path == "/bacon":
+            if "from" not in params or "to" not in params:
+                return 400, {"error": "/bacon needs from and to"}
+            return 200, await self.query("bacon", params["from"], params["to"])
+        if url.path == "/avg":
+            if "from" not in params:
+                return 400, {"error": "/avg needs from"}
+            return 200, await self.query("avg", params["from"])
+        return 404, {"error": f"Unknown path: {url.path}"}
+
+    async def handle(self, reader, writer) -> None:
+        """
+        Serves the requests of one connection (HTTP/1.1 keep-alive) until it closes.
+        """
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            while True:
+                requestLine = await reader.readline()
+                if not requestLine:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                parts = requestLine.decode("latin-1").split()
+                if len(parts) != 3:
+                    status, body = 400, {"error": "Bad request line"}
+                elif parts[0] != "GET":
+                    status, body = 405, {"error": "Only GET is supported"}
+                else:
+                    try:
+                        status, body = await self.route(parts[1])
+                    except Exception as e: # Not cached, so the next identical query runs again.
+                        status, body = 500, {"error": f"{type(e).__name__}: {e}"}
+
+                keepAlive = headers.get("connection", "").lower() != "close"
+                data = json.dumps(body).encode("utf-8")
+                writer.write(f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                             f"Content-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keepAlive else 'close'}\r\n\r\n".encode("latin-1") + data)
+                await writer.drain()
+                if not keepAlive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.connections.discard(task)
+            writer.close()
+
+    async def start(self, host = "127.0.0.1", port = 8507):
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server
+
+    async def serveForever(self, host = "127.0.0.1", port = 8507) -> None:
+        await self.start(host, port)
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def stop(self) -> None:
+        """
+        Stops accepting connections, waits for the open ones to finish and shuts the pool down.
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        await asyncio.gather(*self.connections, return_exceptions = True)
+        self.executor.shutdown(wait = False)
+
+
+async def _fetch(reader, writer, target):
+    """
+    Sends one keep-alive GET and returns (status, body).
+    """
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: bacon\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def runLoad(targets, host = "127.0.0.1", port = 8507, concurrency = 8):
+    """
+    Sends every request target to a running server over `concurrency`
+    keep-alive connections, and reports the latencies.
+
+    Parameters
+    ----------
+    targets : list of str
+        Request targets, e.g. from makeTargets.
+    host, port : optional
+        The server address.
+    concurrency : int, optional
+        The number of connections sending requests at the same time.
+
+    Returns
+    -------
+    dict
+        {"requests", "errors", "seconds", "requestsPerSecond", "p50Ms", "p99Ms", "maxMs"}
+    """
+    queue = asyncio.Queue()
+    for target in targets:
+        queue.put_nowait(target)
+    latencies = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port)
+        while not queue.empty():
+            target = queue.get_nowait()
+            start = time.perf_counter()
+            status, _ = await _fetch(reader, writer, target)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                errors += 1
+        writer.close()
+        await writer.wait_closed()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": seconds,
+        "requestsPerSecond": len(latencies) / seconds if seconds else 0,
+        "p50Ms": percentile(latencies, 50),
+        "p99Ms": percentile(latencies, 99),
+        "maxMs": max(latencies, default = 0),
+    }
+
+
+def makeTargets(actors, count, avgShare = 0.05, seed = 17) -> list[str]:
+    """
+    Makes random /bacon (and a share of /avg) request targets over the given actors.
+    """
+    rng = random.Random(seed)
+    targets = []
+    for _ in range(count):
+        if rng.random() < avgShare:
+            targets.append("/avg?" + urlencode({"from": rng.choice(actors)}))
+        else:
+            targets.append("/bacon?" + urlencode({"from": rng.choice(actors), "to": rng.choice(actors)}))
+    return targets
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Serve Bacon number queries over HTTP/JSON.")
+    parser.add_argument("files", nargs = "+", help = "The movie data file(s).")
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--port", type = int, default = 8507)
+    parser.add_argument("--backend", default = "dict")
+    parser.add_argument("--cache-dir", default = None)
+    parser.add_argument("--workers", type = int, default = 4)
+    parser.add_argument("--processes", action = "store_true", help = "Use a process pool instead of threads.")
+    parser.add_argument("--load", type = int, default = 0,
+                        help = "Instead of serving forever, send this many random requests and print the latencies.")
+    parser.add_argument("--concurrency", type = int, default = 8)
+    args = parser.parse_args()
+
+    server = BaconServer(args.files, args.backend, args.cache_dir, args.workers, args.processes)
+    if not args.load:
+        print(f"Serving on http://{args.host}:{args.port}")
+        asyncio.run(server.serveForever(args.host, args.port))
+        return
+
+    async def loadTest():
+        await server.start(args.host, args.port)
+        targets = makeTargets(server.calculator._actors(), args.load)
+        report = await runLoad(targets, args.host, args.port, args.concurrency)
+        await server.stop()
+        return report
+
+    print(json.dumps(asyncio.run(loadTest()), indent = 4))
+
+
+if __name__ == '__main__':
+    main()
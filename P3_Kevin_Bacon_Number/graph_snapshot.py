@@ -0,0 +1,194 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+from bacon_graph import NameTable
+
+MAGIC = b"BACONSNP"
+VERSION = 3
+# Snapshot layout:
+#   MAGIC | u32 version | u32 header length | JSON header | padding | sections
+# The JSON header holds the source key, the graph class, the name tables and
+# the (offset, length) of every section. Every section starts on an 8-byte
+# boundary, so the arrays can be used straight from the mmap with
+# memoryview.cast(typecode), without copying.
+PREFIX = struct.Struct("<8sII")
+
+
+def snapshotKey(fileNames):
+    """
+    Builds the key that identifies the source data of a snapshot.
+
+    Parameters
+    ----------
+    fileNames : str or list of str
+        The movie data file(s) the graph is built from.
+
+    Returns
+    -------
+    list of list
+        [absolute path, mtime in ns, size in bytes] for every file.
+    """
+    if isinstance(fileNames, str):
+        fileNames = [fileNames]
+    key = []
+    for fileName in fileNames:
+        stat = os.stat(fileName)
+        key.append([os.path.abspath(fileName), stat.st_mtime_ns, stat.st_size])
+    return key
+
+
+def snapshotPath(cacheDir, fileNames, kind):
+    """
+    Returns the snapshot file name for the given source file(s) and backend kind.
+    """
+    if isinstance(fileNames, str):
+        fileNames = [fileNames]
+    paths = "\n".join(os.path.abspath(fileName) for fileName in fileNames)
+    digest = hashlib.sha1(paths.encode("utf-8")).hexdigest()[:12]
+    baseName = os.path.basename(fileNames[0])
+    return os.path.join(cacheDir, f"{baseName}.{kind}.{digest}.snap")
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+def saveSnapshot(graph, fileName, key) -> None:
+    """
+    Writes a compact graph (or other array-backed data, e.g. a LandmarkOracle)
+    to a snapshot file.
+
+    Parameters
+    ----------
+    graph : CompactGraph or BipartiteGraph
+        The graph to save. Its class lists its arrays in Arrays, and its name
+        tables in NameTables if they are not actors and movies.
+    fileName : str
+        The snapshot file to write. It is replaced atomically.
+    key : list
+        The source key from snapshotKey.
+    """
+    tables = getattr(graph, "NameTables", ("actors", "movies"))
+    sections = {name: "\n".join(getattr(graph, name).names).encode("utf-8") for name in tables}
+    typecodes = {}
+    for name in graph.Arrays:
+        data = getattr(graph, name)
+        # An array from a loaded snapshot is a memoryview, which has format instead.
+        typecodes[name] = getattr(data, "typecode", None) or data.format
+        sections[name] = data.tobytes()
+
+    header = {
+        "key": key,
+        "kind": type(graph).__name__,
+        "counts": {name: len(getattr(graph, name)) for name in tables},
+        "typecodes": typecodes,
+        "sections": {},
+    }
+    offset = 0
+    for name, data in sections.items():
+        header["sections"][name] = [offset, len(data)]
+        offset = _align(offset + len(data))
+    headerBytes = json.dumps(header).encode("utf-8")
+    dataStart = _align(PREFIX.size + len(headerBytes))
+
+    tmpName = fileName + ".tmp"
+    f = open(tmpName, mode = "wb")
+    f.write(PREFIX.pack(MAGIC, VERSION, len(headerBytes)))
+    f.write(headerBytes)
+    f.write(b"\0" * (dataStart - PREFIX.size - len(headerBytes)))
+    for name, data in sections.items():
+        f.write(data)
+        f.write(b"\0" * (_align(len(data)) - len(data)))
+    f.close()
+    os.replace(tmpName, fileName)
+
+
+def loadSnapshot(fileName, graphClass, key = None):
+    """
+    Loads a graph from a snapshot file with mmap.
+
+    Parameters
+    ----------
+    fileName : str
+        The snapshot file to read.
+    graphClass : type
+        CompactGraph, BipartiteGraph or LandmarkOracle, the class the snapshot was saved from.
+    key : list, optional
+        If given, the snapshot is only loaded if it was saved with this key.
+
+    Returns
+    -------
+    CompactGraph or BipartiteGraph or None
+        The graph, or None if the snapshot is missing, stale or not readable.
+    """
+    try:
+        f = open(fileName, mode = "rb")
+    except OSError:
+        return None
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    finally:
+        f.close()
+
+    try:
+        magic, version, headerLength = PREFIX.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION:
+            return None
+        header = json.loads(mm[PREFIX.size:PREFIX.size + headerLength])
+    except (struct.error, ValueError):
+        return None
+    if header["kind"] != graphClass.__name__:
+        return None
+    if key is not None and header["key"] != key:
+        return None
+
+    dataStart = _align(PREFIX.size + headerLength)
+    view = memoryview(mm)
+
+    def section(name):
+        offset, length = header["sections"][name]
+        return view[dataStart + offset:dataStart + offset + length]
+
+    def names(name):
+        if header["counts"][name] == 0:
+            return []
+        return bytes(section(name)).decode("utf-8").split("\n")
+
+    tables = [NameTable(names(name)) for name in header["counts"]]
+    arrays = {name: section(name).cast(header["typecodes"][name]) for name in graphClass.Arrays}
+    return graphClass.fromArrays(*tables, arrays)
+
+
+def loadOrBuild(fileNames, graphClass, kind, cacheDir, build):
+    """
+    Loads a graph from its snapshot, or builds it and saves a new snapshot.
+
+    Parameters
+    ----------
+    fileNames : str or list of str
+        The movie data file(s) the graph is built from.
+    graphClass : type
+        CompactGraph, BipartiteGraph or LandmarkOracle.
+    kind : str
+        The backend (or oracle) name, used in the snapshot file name.
+    cacheDir : str
+        The directory to keep snapshots in. It is created if needed.
+    build : callable
+        Called with no arguments to build the graph if the snapshot is stale.
+
+    Returns
+    -------
+    CompactGraph or BipartiteGraph
+    """
+    key = snapshotKey(fileNames)
+    fileName = snapshotPath(cacheDir, fileNames, kind)
+    graph = loadSnapshot(fileName, graphClass, key)
+    if graph is None:
+        graph = build()
+        os.makedirs(cacheDir, exist_ok = True)
+        saveSnapshot(graph, fileName, key)
+    return graph
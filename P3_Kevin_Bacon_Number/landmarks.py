@@ -0,0 +1,236 @@
+from array import array
+import numpy as np
+
+
+class LandmarkOracle:
+    """
+    Bounds Bacon numbers from precomputed distances to a few landmark actors.
+
+    For every landmark L, d(s, t) is at least |d(L, s) - d(L, t)| and at most
+    d(L, s) + d(L, t) (the triangle inequality), so one row lookup per
+    actor gives a lower and an upper bound in microseconds. Landmarks are
+    high-degree actors, which sit close to most others and make the bounds
+    tight. An actor that one landmark reaches and the other does not is in
+    another connected component, so unreachable pairs are answered exactly.
+
+    The exact search (calcBaconNumber) is a bidirectional BFS that does not
+    expand any actor v with depth(v) + lower bound(v, other end) > upper
+    bound, since such an actor is on no shortest path, and that stops as
+    soon as it finds a path as short as the lower bound.
+
+    Parameters
+    ----------
+    actors : NameTable
+        The interned actor names; the distance rows are indexed by actor ID.
+    landmarkIds : array of int
+        The actor IDs of the landmarks.
+    distances : array of int
+        The flattened (actor, landmark) distance matrix, -1 if unreachable.
+        It is actor-major, so the distances of one actor are contiguous.
+
+    Attributes
+    ----------
+    matrix : ndarray of int16
+        distances as a (len(actors), len(landmarkIds)) matrix.
+    eccentricities : list of int
+        The largest distance from every landmark.
+    lastVisited : int
+        The number of actors visited by the last calcBaconNumber search.
+    """
+
+    # The arrays and name tables that make up the oracle, as saved in a snapshot.
+    Arrays = ("landmarkIds", "distances")
+    NameTables = ("actors",)
+
+    def __init__(self, actors, landmarkIds, distances) -> None:
+        self.actors = actors
+        self.landmarkIds = landmarkIds
+        self.distances = distances
+        self.matrix = np.frombuffer(distances, dtype = np.int16).reshape(len(actors), len(landmarkIds))
+        self.eccentricities = self.matrix.max(axis = 0, initial = 0).tolist()
+        self.lastVisited = 0
+
+    @classmethod
+    def fromArrays(cls, actors, arrays):
+        """
+        Rebuilds the oracle from its arrays, e.g. memoryviews of a loaded snapshot.
+        """
+        return cls(actors, arrays["landmarkIds"], arrays["distances"])
+
+    @classmethod
+    def build(cls, search, count = 16):
+        """
+        Picks landmarks and runs one BFS from each.
+
+        Landmarks are taken in order of co-star degree (see FrontierBFS.degrees,
+        not the number of movies), skipping actors that are co-stars of
+        (distance 1 from) a landmark already chosen, so they are spread over
+        the graph and over its components.
+
+        Parameters
+        ----------
+        search : FrontierBFS
+            The search over the graph, see BaconNumberCalculator.frontierSearch.
+        count : int, optional
+            The number of landmarks.
+
+        Returns
+        -------
+        LandmarkOracle
+        """
+        order = np.argsort(-search.degrees(), kind = "stable")
+        landmarkIds = array("i")
+        rows = []
+        covered = np.zeros(len(search), dtype = bool)
+        for actorId in order:
+            if len(landmarkIds) == count:
+                break
+            if covered[actorId]:
+                continue
+            distances = search.distanceArray(actorId)
+            covered |= (distances >= 0) & (distances <= 1)
+            landmarkIds.append(int(actorId))
+            rows.append(distances.astype(np.int16))
+        matrix = np.column_stack(rows) if rows else np.zeros((len(search), 0), dtype = np.int16)
+        return cls(search.actors, landmarkIds, array("h", matrix.tobytes()))
+
+    def __len__(self) -> int:
+        return len(self.landmarkIds)
+
+    def landmarks(self) -> list[str]:
+        """
+        Returns the names of the landmark actors.
+        """
+        return [self.actors.names[landmarkId] for landmarkId in self.landmarkIds]
+
+    def bounds(self, startActor, endActor) -> tuple[int, float]:
+        """
+        Bounds the Bacon number between two actors without searching.
+
+        Parameters
+        ----------
+        startActor : str
+            The name of the starting actor.
+        endActor : str
+            The name of the ending actor.
+
+        Returns
+        -------
+        tuple[int, float]
+            (lower, upper). Equal bounds are the exact Bacon number. (-1, -1)
+            if an actor is not in the graph or the two are not connected, and
+            upper is inf if no landmark reaches them.
+        """
+        if startActor not in self.actors or endActor not in self.actors:
+            return -1, -1
+        if startActor == endActor:
+            return 0, 0
+        # Plain lists are faster than NumPy for a handful of landmarks.
+        fromStart = self.matrix[self.actors.ids[startActor]].tolist()
+        fromEnd = self.matrix[self.actors.ids[endActor]].tolist()
+        lower, upper = 1, float("inf")
+        for d1, d2 in zip(fromStart, fromEnd):
+            if (d1 < 0) != (d2 < 0):
+                return -1, -1 # The landmark reaches only one of them.
+            if d1 >= 0:
+                lower = max(lower, abs(d1 - d2))
+                upper = min(upper, d1 + d2)
+        return lower, upper
+
+    def estimate(self, startActor, endActor) -> float:
+        """
+        Returns the landmark estimate of the Bacon number: the upper bound, the
+        length of the shortest path through a landmark. -1 if not connected.
+        """
+        return self.bounds(startActor, endActor)[1]
+
+    def _lowerBounds(self, actors, target) -> np.ndarray:
+        """
+        Returns the lower bound of the distance from each actor to the target row.
+        """
+        reach = np.flatnonzero(target >= 0)
+        if not reach.size:
+            return np.zeros(len(actors), dtype = np.int32)
+        ids = [self.actors.ids[actor] for actor in actors]
+        rows = self.matrix[ids][:, reach].astype(np.int32)
+        return np.abs(rows - target[reach].astype(np.int32)).max(axis = 1)
+
+    def calcBaconNumber(self, startActor, endActor, neighbors) -> list[int | list[str]]:
+        """
+        Calculates the exact Bacon number with a bidirectional BFS pruned by the bounds.
+
+        Parameters
+        ----------
+        startActor : str
+            The name of the starting actor.
+        endActor : str
+            The name of the ending actor.
+        neighbors : callable
+            Returns the (neighbor, movie) pairs of an actor, e.g.
+            BaconNumberCalculator._neighbors.
+
+        Returns
+        -------
+        List[int, List[str]]
+            The same result as BaconNumberCalculator.calcBaconNumber.
+        """
+        lower, upper = self.bounds(startActor, endActor)
+        self.lastVisited = 0
+        if lower == -1:
+            return [-1, []]
+        if lower == 0:
+            return [0, [startActor]]
+
+        # parents[0][actor] = (actor before it, movie), from startActor.
+        # parents[1][actor] = (actor after it, movie), towards endActor.
+        parents = ({startActor: None}, {endActor: None})
+        dists = ({startActor: 0}, {endActor: 0})
+        frontiers = [[startActor], [endActor]]
+        # The distances of the other end, which the bounds are taken against.
+        targets = (self.matrix[self.actors.ids[endActor]], self.matrix[self.actors.ids[startActor]])
+        # No actor's lower bound to the other end can be larger than this, so
+        # a frontier with depth + maxBound <= upper cannot be pruned and is not checked.
+        maxBound = [max((max(ecc - d, d) for ecc, d in zip(self.eccentricities, target.tolist()) if d >= 0),
+                        default = 0) for target in targets]
+
+        meet = None
+        while frontiers[0] and frontiers[1] and meet is None:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            frontier, dist, otherDist = frontiers[side], dists[side], dists[1 - side]
+            depth = dist[frontier[0]]
+            # Actors that cannot be on a shortest path are found, but not expanded.
+            if depth + maxBound[side] > upper:
+                keep = depth + self._lowerBounds(frontier, targets[side]) <= upper
+                frontier = [actor for actor, kept in zip(frontier, keep) if kept]
+
+            best = None
+            newFrontier = []
+            for current in frontier:
+                for neighbor, movie in neighbors(current):
+                    if neighbor in dist:
+                        continue
+                    parents[side][neighbor] = (current, movie)
+                    dist[neighbor] = depth + 1
+                    newFrontier.append(neighbor)
+                    if neighbor in otherDist:
+                        length = depth + 1 + otherDist[neighbor]
+                        if best is None or length < best:
+                            best, meet = length, neighbor
+                if best == lower: # No path can be shorter than the lower bound.
+                    break
+            frontiers[side] = newFrontier
+
+        self.lastVisited = len(dists[0]) + len(dists[1])
+        if meet is None:
+            return [-1, []]
+        path = [meet]
+        current = meet
+        while current != startActor:
+            current, movie = parents[0][current]
+            path += [movie, current]
+        path.reverse()
+        current = meet
+        while current != endActor:
+            current, movie = parents[1][current]
+            path += [movie, current]
+        return [(len(path) - 1) / 2, path]
@@ -0,0 +1,74 @@
+import os
+import random
+import unittest
+from bacon_number import BaconNumberCalculator
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "PopularCast.txt")
+
+
+class TestBackends(unittest.TestCase):
+    '''
+    The csr and bipartite backends must give the distances of the dict backend on
+    PopularCast.txt (122k actors, so only a few sampled searches).
+    '''
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.reference = BaconNumberCalculator(DATA_FILE)
+        cls.calculators = {backend: BaconNumberCalculator(DATA_FILE, backend) for backend in ["csr", "bipartite"]}
+        rng = random.Random(11)
+        actors = sorted(cls.reference.adjList)
+        cls.starts = rng.sample(actors, 2)
+        cls.ends = rng.sample(actors, 20)
+        cls.pairs = [(rng.choice(actors), rng.choice(actors)) for _ in range(12)]
+        cls.distances = {start: cls.reference.calcDistances(start) for start in cls.starts}
+
+    def assertValidPath(self, result, start, end) -> None:
+        '''
+        Checks that the path of a calcBaconNumber result links start to end through shared movies.
+        '''
+        baconNumber, path = result
+        if baconNumber == -1:
+            self.assertEqual(path, [])
+            return
+        self.assertEqual((path[0], path[-1], len(path)), (start, end, 2 * baconNumber + 1))
+        casts = self.reference.movieCasts
+        for i in range(0, len(path) - 2, 2):
+            self.assertIn(path[i], casts[path[i + 1]])
+            self.assertIn(path[i + 2], casts[path[i + 1]])
+
+    def test_same_actors(self) -> None:
+        for backend, calculator in self.calculators.items():
+            self.assertEqual(sorted(calculator._actors()), sorted(self.reference.adjList), backend)
+
+    def test_distances(self) -> None:
+        for start in self.starts:
+            expected = self.distances[start]
+            for backend, calculator in self.calculators.items():
+                for vectorized in [False, True]:
+                    self.assertEqual(calculator.calcDistances(start, vectorized = vectorized), expected,
+                                     (backend, start, vectorized))
+
+    def test_bacon_numbers(self) -> None:
+        expected = [self.reference.calcBaconNumber(start, end)[0] for start, end in self.pairs]
+        self.assertNotIn(-1, expected[:1]) # The sample is not all disconnected pairs.
+        for backend, calculator in self.calculators.items():
+            for bidirectional in [True, False]:
+                results = [calculator.calcBaconNumber(start, end, bidirectional) for start, end in self.pairs]
+                self.assertEqual([result[0] for result in results], expected, (backend, bidirectional))
+                for result, (start, end) in zip(results, self.pairs):
+                    self.assertValidPath(result, start, end)
+
+    def test_batch(self) -> None:
+        # One BFS tree per start, so the queries share the two sampled starts.
+        queries = [(start, end) for start in self.starts for end in self.ends]
+        expected = [self.distances[start].get(end, -1) for start, end in queries]
+        for backend, calculator in self.calculators.items():
+            results = calculator.calcBaconNumbers(queries)
+            self.assertEqual([result[0] for result in results], expected, backend)
+            for result, (start, end) in zip(results, queries):
+                self.assertValidPath(result, start, end)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,207 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from bacon_number import BaconNumberCalculator
+from bacon_analytics import GraphAnalytics
+
+Backends = ["dict", "csr", "bipartite"]
+
+
+def writeMovies(directory, lines, name = "movies.txt") -> str:
+    '''
+    Writes movie/actor1/actor2/... lines to a file in directory and returns its path.
+    '''
+    fileName = os.path.join(directory, name)
+    f = open(fileName, mode = "w", encoding = "ISO-8859-1")
+    f.write("\n".join(lines) + "\n")
+    f.close()
+    return fileName
+
+
+class TestRepeatedNames(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        # M1 lists A twice, like some titles of Bacon_06.
+        self.fileName = writeMovies(self.directory, ["M1/A/A/B", "M2/B/C", "M3/C/D/D"])
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_no_self_loop(self) -> None:
+        calculator = BaconNumberCalculator(self.fileName)
+        for actor, neighbors in calculator.adjList.items():
+            self.assertNotIn(actor, neighbors)
+        self.assertEqual(calculator.movieCasts["M1"], ["A", "B"])
+
+    def test_same_degrees_on_every_backend(self) -> None:
+        histograms = [GraphAnalytics(BaconNumberCalculator(self.fileName, backend)).degreeHistogram()
+                      for backend in Backends]
+        self.assertEqual(histograms[0], {1: 2, 2: 2})
+        for histogram in histograms[1:]:
+            self.assertEqual(histogram, histograms[0])
+
+
+class TestAvgNumber(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.calculator = BaconNumberCalculator(writeMovies(self.directory,
+                                                            ["M1/A/B/C", "M2/C/D", "M3/D/E", "M4/Z"]))
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_threshold_samples(self) -> None:
+        # calcAvgNumber(actor, threshold) kept its meaning: a sampled estimate.
+        random.seed(3)
+        default = self.calculator.calcAvgNumber("A", 0.05)
+        random.seed(3)
+        self.assertEqual(default, self.calculator.calcAvgNumber("A", 0.05, mode = "sample"))
+
+    def test_exact(self) -> None:
+        for vectorized in [False, True]:
+            self.assertEqual(self.calculator.calcAvgNumber("A", mode = "exact", vectorized = vectorized),
+                             (1 + 1 + 2 + 3) / 4)
+
+    def test_isolated_and_missing(self) -> None:
+        for mode in ["sample", "exact"]:
+            self.assertEqual(self.calculator.calcAvgNumber("Z", mode = mode), 0)
+            self.assertEqual(self.calculator.calcAvgNumber("Y", mode = mode), -1)
+        with self.assertRaises(ValueError):
+            self.calculator.calcAvgNumber("A", mode = "median")
+
+
+class TestLandmarks(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        # A has the most movies but one co-star; C has the most co-stars.
+        self.fileName = writeMovies(self.directory, ["M1/A/B", "M2/A/B", "M3/A/B", "M4/B/C",
+                                                     "M5/C/D/E/F", "M6/F/G"])
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_picked_by_costar_degree(self) -> None:
+        for backend in Backends:
+            oracle = BaconNumberCalculator(self.fileName, backend).landmarkOracle(1)
+            self.assertEqual(oracle.landmarks(), ["C"], backend)
+
+    def test_snapshot_per_backend(self) -> None:
+        cacheDir = os.path.join(self.directory, "cache")
+        for backend in ["csr", "bipartite", "csr"]:
+            calculator = BaconNumberCalculator(self.fileName, backend, cacheDir = cacheDir)
+            oracle = calculator.landmarkOracle(2)
+            for start in calculator._actors():
+                for end in calculator._actors():
+                    lower, upper = oracle.bounds(start, end)
+                    baconNumber = calculator.calcBaconNumber(start, end)[0]
+                    self.assertTrue(lower <= baconNumber <= upper, (backend, start, end))
+        # The files are named movies.txt.<kind>.<digest>.snap.
+        kinds = {".".join(name.split(".")[2:-2]) for name in os.listdir(cacheDir)}
+        self.assertEqual(kinds, {"csr", "bipartite", "landmarks2.csr", "landmarks2.bipartite"})
+
+
+class TestIncrementalUpdates(unittest.TestCase):
+    '''
+    addMovie and removeMovie must answer like a calculator rebuilt from the
+    changed file, and only drop the cached BFS trees the change affects.
+    '''
+
+    Movies = ["M1/A/B/C", "M2/C/D", "M3/D/E", "M4/F/G", "M5/E/H"]
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.calculator = BaconNumberCalculator(writeMovies(self.directory, self.Movies))
+        # Cache the trees of A (which reaches A..E and H) and F (which reaches F and G).
+        self.calculator.calcBaconNumbers([("A", "E"), ("F", "G")])
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def assertSameAnswers(self, lines) -> None:
+        '''
+        Compares every query of self.calculator with a calculator built from lines.
+        '''
+        rebuilt = BaconNumberCalculator(writeMovies(self.directory, lines, "rebuilt.txt"))
+        actors = sorted(set(rebuilt.adjList) | set(self.calculator.adjList) | {"Z"})
+        queries = [(a, b) for a in actors for b in actors]
+        expected = [rebuilt.calcBaconNumber(a, b)[0] for a, b in queries]
+        single = [self.calculator.calcBaconNumber(a, b) for a, b in queries]
+        batch = self.calculator.calcBaconNumbers(queries)
+        self.assertEqual([result[0] for result in single], expected)
+        self.assertEqual([result[0] for result in batch], expected)
+        for result in single + batch: # Every hop must be a movie both actors are in now.
+            path = result[1]
+            for i in range(0, len(path) - 2, 2):
+                self.assertIn(path[i], self.calculator.movieCasts[path[i + 1]])
+                self.assertIn(path[i + 2], self.calculator.movieCasts[path[i + 1]])
+
+    def test_add_shortcut(self) -> None:
+        treeF = self.calculator.treeCache["F"]
+        self.calculator.addMovie("M6", ["B", "E"])
+        self.assertNotIn("A", self.calculator.treeCache) # It reaches B and E.
+        self.assertIs(self.calculator.treeCache["F"], treeF)
+        self.assertEqual(self.calculator.calcBaconNumber("A", "H")[0], 3)
+        self.assertSameAnswers(self.Movies + ["M6/B/E"])
+
+    def test_add_joins_components(self) -> None:
+        self.calculator.addMovie("M6", ["G", "H", "I"])
+        self.assertEqual(self.calculator.treeCache, {})
+        self.assertSameAnswers(self.Movies + ["M6/G/H/I"])
+
+    def test_add_existing_title(self) -> None:
+        version = self.calculator.version
+        with self.assertRaises(ValueError):
+            self.calculator.addMovie("M1", ["A", "Z"])
+        self.assertEqual(self.calculator.version, version)
+        self.assertSameAnswers(self.Movies)
+
+    def test_remove_bridge(self) -> None:
+        treeF = self.calculator.treeCache["F"]
+        self.calculator.removeMovie("M2")
+        self.assertNotIn("A", self.calculator.treeCache) # Its tree uses the C - D edge of M2.
+        self.assertIs(self.calculator.treeCache["F"], treeF)
+        self.assertEqual(self.calculator.calcBaconNumber("A", "E"), [-1, []])
+        self.assertSameAnswers([line for line in self.Movies if not line.startswith("M2/")])
+
+    def test_remove_relabels_shared_edge(self) -> None:
+        self.calculator.addMovie("M6", ["C", "D", "J"])
+        self.calculator.removeMovie("M2")
+        self.assertEqual(self.calculator.adjList["C"]["D"], "M6")
+        self.assertSameAnswers([line for line in self.Movies if not line.startswith("M2/")] + ["M6/C/D/J"])
+
+    def test_remove_drops_lone_actors(self) -> None:
+        self.calculator.removeMovie("M5")
+        self.assertNotIn("H", self.calculator.adjList)
+        self.assertEqual(self.calculator.findActors("H"), [])
+        self.assertSameAnswers([line for line in self.Movies if not line.startswith("M5/")])
+
+    def test_repeated_names(self) -> None:
+        self.calculator.addMovie("M6", ["A", "A", "H", "H"])
+        self.assertNotIn("A", self.calculator.adjList["A"])
+        self.assertSameAnswers(self.Movies + ["M6/A/A/H/H"])
+        self.calculator.removeMovie("M6")
+        self.assertSameAnswers(self.Movies)
+
+    def test_remove_missing_title(self) -> None:
+        version = self.calculator.version
+        with self.assertRaises(KeyError):
+            self.calculator.removeMovie("M9")
+        self.assertEqual(self.calculator.version, version)
+        self.assertEqual(set(self.calculator.treeCache), {"A", "F"})
+        self.assertSameAnswers(self.Movies)
+
+    def test_compact_backend(self) -> None:
+        calculator = BaconNumberCalculator(os.path.join(self.directory, "movies.txt"), "csr")
+        with self.assertRaises(ValueError):
+            calculator.addMovie("M6", ["A", "F"])
+        with self.assertRaises(ValueError):
+            calculator.removeMovie("M1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import asyncio
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import bacon_server
+from bacon_server import BaconServer, _fetch
+from unittest_bacon_number import writeMovies
+
+
+class TestBaconServer(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        fileName = writeMovies(self.directory, ["M1/A/B", "M2/B/C", "M3/D/E"])
+        self.server = BaconServer(fileName, workers = 2)
+        await self.server.start(port = 0)
+        port = self.server.server.sockets[0].getsockname()[1]
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+
+    async def asyncTearDown(self) -> None:
+        self.writer.close()
+        await self.writer.wait_closed()
+        await self.server.stop()
+        shutil.rmtree(self.directory)
+
+    async def test_queries(self) -> None:
+        status, body = await _fetch(self.reader, self.writer, "/bacon?from=A&to=C")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["baconNumber"], 2)
+        self.assertEqual(body["path"], ["A", "M1", "B", "M2", "C"])
+        status, body = await _fetch(self.reader, self.writer, "/bacon?from=A&to=D")
+        self.assertEqual((status, body["baconNumber"]), (200, -1))
+        status, body = await _fetch(self.reader, self.writer, "/avg?from=A")
+        self.assertEqual((status, body["avg"]), (200, 1.5))
+
+    async def test_client_errors(self) -> None:
+        self.assertEqual((await _fetch(self.reader, self.writer, "/bacon?from=A"))[0], 400)
+        self.assertEqual((await _fetch(self.reader, self.writer, "/nowhere"))[0], 404)
+
+    async def test_failed_query(self) -> None:
+        with mock.patch.object(bacon_server, "_runQuery", side_effect = RuntimeError("pool broke")):
+            status, body = await _fetch(self.reader, self.writer, "/bacon?from=A&to=C")
+        self.assertEqual(status, 500)
+        self.assertEqual(body, {"error": "RuntimeError: pool broke"})
+        # The connection stays open, and the failure was not cached.
+        status, body = await _fetch(self.reader, self.writer, "/bacon?from=A&to=C")
+        self.assertEqual((status, body["baconNumber"]), (200, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
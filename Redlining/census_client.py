@@ -0,0 +1,184 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+
+FCC_URL = "https://geo.fcc.gov/api/census/area"
+ACS_URL = "https://api.census.gov/data/2018/acs/acs5"
+
+
+class CensusError(Exception):
+    """
+    Raised when a request still fails after all its retries.
+    """
+
+
+class CensusClient:
+    """
+    A thread-safe HTTP client for the FCC and Census Bureau APIs.
+
+    Requests share one connection-pooled requests.Session. getMany runs
+    them in a thread pool, at most maxWorkers at a time. A failed request
+    (any requests error, e.g. a connection error, a timeout or a truncated
+    body; an invalid JSON body; 429 or 5xx) is retried with exponential
+    backoff and jitter, up to maxRetries times, and then raises CensusError,
+    so a flaky endpoint can no longer hang a run.
+
+    Parameters
+    ----------
+    fccUrl : str, optional
+        The FCC census area endpoint. Point it at a local server for testing.
+    acsUrl : str, optional
+        The ACS 5-year endpoint.
+    maxWorkers : int, optional
+        The number of requests in flight at the same time.
+    maxRetries : int, optional
+        The number of retries of a failed request.
+    backoff : float, optional
+        The delay before the first retry in seconds; it doubles every retry.
+    maxBackoff : float, optional
+        The longest delay between two retries.
+    timeout : float, optional
+        The connect and read timeout of every request in seconds.
+    rateLimit : float, optional
+        The most requests started per second over all threads. None is unlimited.
+    cache : ResponseCache, optional
+        If given, get answers from it when it can and stores every successful response in it.
+    """
+
+    RetryStatus = {429, 500, 502, 503, 504}
+
+    def __init__(self, fccUrl = FCC_URL, acsUrl = ACS_URL, maxWorkers = 8, maxRetries = 5,
+                 backoff = 0.5, maxBackoff = 8.0, timeout = 10.0, rateLimit = None, cache = None) -> None:
+        self.fccUrl = fccUrl
+        self.acsUrl = acsUrl
+        self.maxWorkers = maxWorkers
+        self.maxRetries = maxRetries
+        self.backoff = backoff
+        self.maxBackoff = maxBackoff
+        self.timeout = timeout
+        self.rateLimit = rateLimit
+        self.cache = cache
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections = maxWorkers, pool_maxsize = maxWorkers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._nextStart = 0.0
+
+    def _waitTurn(self) -> None:
+        """
+        Blocks until the rate limit allows another request to start.
+        """
+        if not self.rateLimit:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._nextStart)
+            self._nextStart = start + 1 / self.rateLimit
+        time.sleep(start - now)
+
+    def get(self, url, params):
+        """
+        Sends one GET request, retrying on failure, and returns the parsed JSON.
+        The cache, if any, is consulted first.
+
+        Raises
+        ------
+        CensusError
+            If the request still fails after maxRetries retries, or gets an
+            error status that retrying cannot fix (e.g. 400 or 404).
+        """
+        if self.cache is not None:
+            cached = self.cache.get(url, params)
+            if cached is not None:
+                return cached
+        for attempt in range(self.maxRetries + 1):
+            self._waitTurn()
+            try:
+                response = self.session.get(url, params = params, timeout = self.timeout)
+                if response.status_code == 200:
+                    result = response.json()
+                    if self.cache is not None:
+                        self.cache.put(url, params, result)
+                    return result
+                if response.status_code not in self.RetryStatus:
+                    raise CensusError(f"{url} returned {response.status_code}")
+                error = f"{url} returned {response.status_code}"
+            except (requests.RequestException, ValueError) as e: # Incl. truncated or badly encoded bodies.
+                error = f"{url} failed: {e}"
+            if attempt < self.maxRetries:
+                delay = min(self.maxBackoff, self.backoff * 2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+        raise CensusError(f"{error} (after {self.maxRetries} retries)")
+
+    def getMany(self, calls) -> list:
+        """
+        Runs many get calls concurrently.
+
+        Parameters
+        ----------
+        calls : list of tuple[str, dict]
+            The (url, params) of every request.
+
+        Returns
+        -------
+        list
+            The JSON result of every call in order, or the CensusError it raised.
+        """
+        def run(call):
+            try:
+                return self.get(*call)
+            except CensusError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers = self.maxWorkers) as executor:
+            return list(executor.map(run, calls))
+
+    def fetchTracts(self, points, year = 2010) -> list:
+        """
+        Looks up the census tract of many points with the FCC API.
+
+        Parameters
+        ----------
+        points : list of tuple[float, float]
+            The (lat, lon) points.
+        year : int, optional
+            The census year.
+
+        Returns
+        -------
+        list of str or None
+            The 9-digit county + tract code of every point (as used by
+            fetchIncome), None if the lookup failed.
+        """
+        # The API expects the parameters in this order.
+        calls = [(self.fccUrl, {"lat": lat, "lon": lon, "censusYear": year, "format": "json"})
+                 for lat, lon in points]
+        tracts = []
+        for result in self.getMany(calls):
+            try:
+                tracts.append(result["results"][0]["block_fips"][2:11])
+            except (TypeError, KeyError, IndexError):
+                tracts.append(None)
+        return tracts
+
+    def fetchTable(self, variables, state = "26"):
+        """
+        Fetches ACS variables for every census tract of a state.
+
+        Parameters
+        ----------
+        variables : str
+            The comma-separated ACS variables, e.g. "B19013_001E".
+        state : str, optional
+            The state FIPS code; 26 is Michigan.
+
+        Returns
+        -------
+        list of list of str
+            The rows of the table, the first row being the header.
+        """
+        return self.get(self.acsUrl, {"get": variables, "for": "tract:*", "in": f"state:{state}"})
@@ -0,0 +1,236 @@
+import numpy as np
+
+
+class PolygonSet:
+    """
+    The rings of many districts packed into flat NumPy arrays, so point tests
+    and sampling can run over every district at once.
+
+    A district can have several rings (MultiPolygon parts and holes); a point
+    is inside a district if it is inside an odd number of its rings (the
+    even-odd rule, as matplotlib's Path uses).
+
+    Parameters
+    ----------
+    districtRings : list of list of list
+        For every district, its rings; a ring is a list of [lon, lat] points.
+
+    Attributes
+    ----------
+    starts, ends : ndarray of float, shape (edges, 2)
+        The two end points of every ring edge, grouped by district.
+    edgeOffsets : ndarray of int
+        The edges of district i are starts[edgeOffsets[i]:edgeOffsets[i+1]].
+    bounds : ndarray of float, shape (districts, 4)
+        The bounding box (minLon, minLat, maxLon, maxLat) of every district.
+    """
+
+    def __init__(self, districtRings) -> None:
+        starts, ends = [], []
+        edgeOffsets = [0]
+        bounds = []
+        for rings in districtRings:
+            rings = [np.asarray(ring, dtype = float).reshape(-1, 2) for ring in rings]
+            rings = [ring for ring in rings if len(ring)]
+            starts.extend(rings)
+            ends.extend(np.roll(ring, -1, axis = 0) for ring in rings) # The last edge closes the ring.
+            edgeOffsets.append(edgeOffsets[-1] + sum(len(ring) for ring in rings))
+            if rings:
+                points = np.concatenate(rings)
+                bounds.append([*points.min(axis = 0), *points.max(axis = 0)])
+            else:
+                bounds.append([np.nan] * 4)
+        self.starts = np.concatenate(starts) if starts else np.zeros((0, 2))
+        self.ends = np.concatenate(ends) if ends else np.zeros((0, 2))
+        self.edgeOffsets = np.array(edgeOffsets, dtype = np.int64)
+        self.bounds = np.array(bounds, dtype = float).reshape(-1, 4)
+
+    def __len__(self) -> int:
+        return len(self.bounds)
+
+    def contains(self, points, owners) -> np.ndarray:
+        """
+        Tests every point against one district, all at once.
+
+        Parameters
+        ----------
+        points : ndarray of float, shape (n, 2)
+            The (lon, lat) points.
+        owners : ndarray of int, shape (n,)
+            The index of the district each point is tested against.
+
+        Returns
+        -------
+        ndarray of bool
+            True where the point is inside its district.
+        """
+        points = np.asarray(points, dtype = float).reshape(-1, 2)
+        owners = np.asarray(owners, dtype = np.int64)
+        first = self.edgeOffsets[owners]
+        counts = self.edgeOffsets[owners + 1] - first
+        total = int(counts.sum())
+        if total == 0:
+            return np.zeros(len(points), dtype = bool)
+        # One row per (point, edge of its district) pair.
+        pointIndex = np.repeat(np.arange(len(points)), counts)
+        edgeIndex = np.arange(total) + np.repeat(first - (np.cumsum(counts) - counts), counts)
+        x, y = points[pointIndex, 0], points[pointIndex, 1]
+        x1, y1 = self.starts[edgeIndex, 0], self.starts[edgeIndex, 1]
+        x2, y2 = self.ends[edgeIndex, 0], self.ends[edgeIndex, 1]
+        # A ray to the right of the point crosses the edge (the even-odd rule).
+        spans = (y1 > y) != (y2 > y)
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            crossX = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        crossings = spans & (x < crossX)
+        return np.bincount(pointIndex, weights = crossings, minlength = len(points)) % 2 == 1
+
+    def samplePoints(self, rng = None, batchSize = 32, maxRounds = 1000) -> np.ndarray:
+        """
+        Draws one uniformly random point inside every district.
+
+        Candidates are drawn uniformly in each district's bounding box and
+        rejected if they fall outside it; every round tests a batch for each
+        district that still has no point, all in one contains call. Unlike a
+        fixed grid, this also finds points in thin districts.
+
+        Parameters
+        ----------
+        rng : numpy.random.Generator, optional
+            The random generator.
+        batchSize : int, optional
+            The candidates drawn per district and round.
+        maxRounds : int, optional
+            The rounds before giving up on a (degenerate) district.
+
+        Returns
+        -------
+        ndarray of float, shape (districts, 2)
+            The (lon, lat) point of every district; NaN for a district without area.
+        """
+        rng = rng or np.random.default_rng()
+        samples = np.full((len(self), 2), np.nan)
+        pending = np.flatnonzero(~np.isnan(self.bounds).any(axis = 1))
+        for _ in range(maxRounds):
+            if pending.size == 0:
+                break
+            owners = np.repeat(pending, batchSize)
+            low, high = self.bounds[owners, :2], self.bounds[owners, 2:]
+            candidates = low + rng.random((len(owners), 2)) * (high - low)
+            inside = self.contains(candidates, owners)
+            # The first accepted candidate of every district.
+            accepted, firstIndex = np.unique(owners[inside], return_index = True)
+            samples[accepted] = candidates[inside][firstIndex]
+            pending = np.setdiff1d(pending, accepted, assume_unique = True)
+        return samples
+
+
+class GridIndex:
+    """
+    A uniform grid over the bounding boxes of a PolygonSet, for finding the
+    district that contains a point without testing every polygon.
+
+    Every grid cell lists the districts whose bounding box overlaps it, in
+    CSR form. A point is only tested against the districts of its cell whose
+    bounding box holds it, and all the tests of a batch of points run in one
+    PolygonSet.contains call.
+
+    Parameters
+    ----------
+    polygons : PolygonSet
+        The districts to index.
+    cellsPerDistrict : float, optional
+        The number of grid cells per district; the grid is square-ish over
+        the bounding box of all districts.
+
+    Attributes
+    ----------
+    origin : ndarray of float
+        The (lon, lat) of the lower left grid corner.
+    cellSize : ndarray of float
+        The (lon, lat) size of a cell.
+    shape : tuple of int
+        The number of (columns, rows) of the grid.
+    cellOffsets, cellDistricts : ndarray of int
+        The districts of cell c are cellDistricts[cellOffsets[c]:cellOffsets[c+1]].
+    """
+
+    def __init__(self, polygons, cellsPerDistrict = 4.0) -> None:
+        self.polygons = polygons
+        bounds = polygons.bounds
+        valid = np.flatnonzero(~np.isnan(bounds).any(axis = 1))
+        if valid.size:
+            low = bounds[valid, :2].min(axis = 0)
+            high = bounds[valid, 2:].max(axis = 0)
+        else:
+            low, high = np.zeros(2), np.ones(2)
+        span = np.maximum(high - low, 1e-9)
+        cells = max(1.0, cellsPerDistrict * len(valid))
+        side = np.sqrt(span[0] * span[1] / cells)
+        shape = np.maximum(1, np.ceil(span / side)).astype(np.int64)
+        self.origin = low
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.cellSize = span / shape
+
+        # Every (cell, district) pair of a district's bounding box, sorted by cell.
+        first = self._cellCoords(bounds[valid, :2])
+        last = self._cellCoords(bounds[valid, 2:])
+        widths = last[:, 0] - first[:, 0] + 1
+        heights = last[:, 1] - first[:, 1] + 1
+        counts = widths * heights
+        owners = np.repeat(valid, counts)
+        local = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+        columns = np.repeat(first[:, 0], counts) + local % np.repeat(widths, counts)
+        rows = np.repeat(first[:, 1], counts) + local // np.repeat(widths, counts)
+        cellIds = rows * self.shape[0] + columns
+        order = np.argsort(cellIds, kind = "stable")
+        self.cellDistricts = owners[order]
+        self.cellOffsets = np.searchsorted(cellIds[order], np.arange(self.shape[0] * self.shape[1] + 1))
+
+    def _cellCoords(self, points) -> np.ndarray:
+        """
+        Returns the (column, row) of the cell of every point, clipped to the grid.
+        """
+        coords = np.floor((np.asarray(points, dtype = float) - self.origin) / self.cellSize).astype(np.int64)
+        return np.clip(coords, 0, np.array(self.shape) - 1)
+
+    def locate(self, points, chunkSize = 65536) -> np.ndarray:
+        """
+        Finds the district that contains every point.
+
+        Parameters
+        ----------
+        points : ndarray of float, shape (n, 2)
+            The (lon, lat) points.
+        chunkSize : int, optional
+            The points handled per batch, which bounds the memory used.
+
+        Returns
+        -------
+        ndarray of int
+            The index of the containing district of every point (the first
+            one, if districts overlap), -1 if none.
+        """
+        points = np.asarray(points, dtype = float).reshape(-1, 2)
+        result = np.full(len(points), -1, dtype = np.int64)
+        bounds = self.polygons.bounds
+        for start in range(0, len(points), chunkSize):
+            chunk = points[start:start + chunkSize]
+            coords = self._cellCoords(chunk)
+            inGrid = ((chunk >= self.origin) & (chunk <= self.origin + self.cellSize * self.shape)).all(axis = 1)
+            cells = coords[:, 1] * self.shape[0] + coords[:, 0]
+            first = self.cellOffsets[cells]
+            counts = np.where(inGrid, self.cellOffsets[cells + 1] - first, 0)
+            # One row per (point, candidate district) pair.
+            pointIndex = np.repeat(np.arange(len(chunk)), counts)
+            pairIndex = np.arange(int(counts.sum())) + np.repeat(first - (np.cumsum(counts) - counts), counts)
+            owners = self.cellDistricts[pairIndex]
+            box = bounds[owners]
+            pairPoints = chunk[pointIndex]
+            inBox = ((pairPoints >= box[:, :2]) & (pairPoints <= box[:, 2:])).all(axis = 1)
+            pointIndex, owners = pointIndex[inBox], owners[inBox]
+            inside = self.polygons.contains(chunk[pointIndex], owners)
+            pointIndex, owners = pointIndex[inside], owners[inside]
+            # Pairs are in cell order, so the first hit of a point is its lowest district.
+            hits, firstHit = np.unique(pointIndex, return_index = True)
+            result[start + hits] = owners[firstHit]
+        return result
@@ -0,0 +1,151 @@
+import numpy as np
+
+
+def descendingRanks(values) -> np.ndarray:
+    """
+    Ranks values from the largest (rank 1) down with one stable argsort.
+
+    Ties get consecutive ranks in their original order, and NaN values are
+    ranked after all the others.
+    """
+    values = np.asarray(values, dtype = np.float64)
+    order = np.argsort(-values, kind = "stable") # NaN stays NaN, and argsort puts it last.
+    ranks = np.empty(len(values), dtype = np.int64)
+    ranks[order] = np.arange(1, len(values) + 1)
+    return ranks
+
+
+class GroupedStats:
+    """
+    Count, sum, mean, median and percentiles of a value column grouped by a key column.
+
+    The values are sorted once by (group, value) with np.lexsort, so every
+    group is a contiguous, sorted segment of one array: counts and sums
+    come from np.add.reduceat over the segment offsets, and any percentile
+    of every group is read from the segments by index, with no Python loop
+    over the groups. NaN values (districts without an income) are sorted to
+    the end of their segment and left out of every statistic.
+
+    update changes one value and re-sorts only the segment of its group, so
+    only that group's aggregates are recomputed.
+
+    Parameters
+    ----------
+    keys : array-like
+        The group of every row, e.g. the HOLC grades.
+    values : array-like of float
+        The value of every row, e.g. the median incomes; NaN for a missing one.
+    groups : list, optional
+        The groups to report, in order. Default is the sorted distinct keys.
+        Rows with a key outside them are ignored.
+
+    Attributes
+    ----------
+    groups : list
+        The groups, in the order of every returned array.
+    counts : ndarray of int
+        The number of non-NaN values of every group.
+    sums : ndarray of float
+        The sum of the non-NaN values of every group.
+    """
+
+    def __init__(self, keys, values, groups = None) -> None:
+        keys = ["" if key is None else key for key in keys]
+        if groups is None:
+            groups = sorted(set(keys))
+        self.groups = list(groups)
+        codeOf = {group: code for code, group in enumerate(self.groups)}
+        # Rows outside the groups get the code len(groups), a trailing segment that is never reported.
+        self.codes = np.array([codeOf.get(key, len(self.groups)) for key in keys], dtype = np.int64)
+        self.values = np.array(values, dtype = np.float64).reshape(-1)
+        self._sort()
+
+    def _sort(self) -> None:
+        self.order = np.lexsort((self.values, self.codes))
+        self.offsets = np.searchsorted(self.codes[self.order], np.arange(len(self.groups) + 1))
+        self.sorted = self.values[self.order]
+        valid = ~np.isnan(self.sorted)
+        # reduceat needs a valid index for empty trailing segments, and returns one element for empty ones.
+        empty = self.offsets[1:] == self.offsets[:-1]
+        self.counts = np.add.reduceat(np.append(valid, False).astype(np.int64), self.offsets[:-1])
+        self.sums = np.add.reduceat(np.append(np.where(valid, self.sorted, 0.0), 0.0), self.offsets[:-1])
+        self.counts[empty] = 0
+        self.sums[empty] = 0.0
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def index(self, group) -> int:
+        """
+        Returns the position of a group in the returned arrays.
+        """
+        return self.groups.index(group)
+
+    def mean(self) -> np.ndarray:
+        """
+        Returns the mean of every group, NaN for a group without values.
+        """
+        with np.errstate(invalid = "ignore", divide = "ignore"):
+            return np.where(self.counts > 0, self.sums / self.counts, np.nan)
+
+    def percentile(self, q) -> np.ndarray:
+        """
+        Returns the q-th percentile of every group, with the linear
+        interpolation of np.percentile; NaN for a group without values.
+
+        Parameters
+        ----------
+        q : float or array-like of float
+            The percentile(s), between 0 and 100.
+
+        Returns
+        -------
+        ndarray of float
+            Shape (groups,) for a single q, (len(q), groups) for several.
+        """
+        q = np.asarray(q, dtype = np.float64)
+        starts = self.offsets[:-1]
+        position = starts + q[..., None] / 100 * np.maximum(self.counts - 1, 0)
+        low = np.floor(position).astype(np.int64)
+        high = np.minimum(low + 1, starts + np.maximum(self.counts - 1, 0))
+        padded = np.append(self.sorted, np.nan) # Empty groups may point one past the end.
+        result = padded[low] + (position - low) * (padded[high] - padded[low])
+        return np.where(self.counts > 0, result, np.nan)
+
+    def median(self) -> np.ndarray:
+        """
+        Returns the median of every group, NaN for a group without values.
+        """
+        return self.percentile(50)
+
+    def update(self, i, value) -> None:
+        """
+        Changes the value of row i and recomputes the aggregates of its group only.
+
+        The row is moved to its new place inside the sorted segment of its
+        group, which costs O(group size) instead of a full re-sort.
+        """
+        value = np.nan if value is None else float(value)
+        self.values[i] = value
+        code = self.codes[i]
+        if code == len(self.groups):
+            return
+        start, end = self.offsets[code], self.offsets[code + 1]
+        segment = self.order[start:end]
+        segment = segment[segment != i]
+        at = np.searchsorted(self.values[segment], value, side = "right")
+        self.order[start:end] = np.insert(segment, at, i)
+        self.sorted[start:end] = self.values[self.order[start:end]]
+        valid = self.sorted[start:end][~np.isnan(self.sorted[start:end])]
+        self.counts[code] = len(valid)
+        self.sums[code] = valid.sum()
+
+    def summary(self) -> dict:
+        """
+        Returns {group: {"count", "mean", "median"}}, with None for the statistics of a group without values.
+        """
+        means, medians = self.mean(), self.median()
+        return {group: {"count": int(self.counts[k]),
+                        "mean": None if np.isnan(means[k]) else float(means[k]),
+                        "median": None if np.isnan(medians[k]) else float(medians[k])}
+                for k, group in enumerate(self.groups)}
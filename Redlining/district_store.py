@@ -0,0 +1,289 @@
+import struct
+import zipfile
+from collections.abc import Sequence
+import numpy as np
+
+# The prefix of the mask column that marks the None values of a column.
+NONE_PREFIX = "none:"
+# The prefix of the offsets of a text column, whose own array is the UTF-8 bytes of all its values.
+TEXT_PREFIX = "text:"
+# The arrays that hold the district geometry rather than a column.
+GEOMETRY = ("vertices", "ringOffsets", "polygonOffsets", "districtOffsets")
+
+
+def _toColumn(values):
+    """
+    Converts attribute values to a NumPy column and a mask of the None values (or None if there are none).
+    """
+    missing = np.array([value is None for value in values], dtype = bool)
+    present = [value for value in values if value is not None]
+    if all(isinstance(value, (bool, int)) for value in present):
+        column = np.array([0 if value is None else value for value in values], dtype = np.int64)
+    elif all(isinstance(value, (bool, int, float)) for value in present):
+        column = np.array([np.nan if value is None else value for value in values], dtype = np.float64)
+    else:
+        column = np.array(["" if value is None else str(value) for value in values], dtype = str)
+    return column, (missing if missing.any() else None)
+
+
+def _withMissing(values, missing):
+    """
+    Puts the None values back into a column: NaN in a numeric column, None in any other.
+    """
+    if values.dtype.kind in "iuf":
+        values = values.astype(np.float64) if missing is not None else values.copy()
+        if missing is not None:
+            values[missing] = np.nan
+        return values
+    values = values.astype(object)
+    if missing is not None:
+        values[missing] = None
+    return values
+
+
+def _packText(values):
+    """
+    Encodes a column of strings as one UTF-8 byte blob and the offsets of every value in it.
+    """
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype = np.int64)
+    np.cumsum([len(value) for value in encoded], out = offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype = np.uint8), offsets
+
+
+def _unpackText(blob, offsets, i = None):
+    """
+    Decodes value i of a packed text column, or every value as an object array if i is None.
+    """
+    if i is not None:
+        return blob[offsets[i]:offsets[i + 1]].tobytes().decode("utf-8")
+    data = blob.tobytes()
+    values = np.empty(len(offsets) - 1, dtype = object)
+    values[:] = [data[offsets[k]:offsets[k + 1]].decode("utf-8") for k in range(len(values))]
+    return values
+
+
+def _storedArrays(fileName) -> dict:
+    """
+    Finds the data of every stored (uncompressed) member of an .npz file.
+
+    A stored member is a plain .npy file inside the zip archive, so its data
+    starts at a fixed offset in the .npz file and np.memmap can read it in
+    place, see _mapArray. Compressed members (from older files) are left out.
+
+    Returns
+    -------
+    dict
+        {array name: (dtype, shape, order, offset of the data in the file)}.
+    """
+    arrays = {}
+    with open(fileName, mode = "rb") as f, zipfile.ZipFile(f) as archive:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED or not info.filename.endswith(".npy"):
+                continue
+            f.seek(info.header_offset)
+            nameLength, extraLength = struct.unpack("<HH", f.read(30)[26:30]) # The local file header.
+            f.seek(info.header_offset + 30 + nameLength + extraLength)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortranOrder, dtype = np.lib.format.read_array_header_1_0(f)
+            elif version == (2, 0):
+                shape, fortranOrder, dtype = np.lib.format.read_array_header_2_0(f)
+            else:
+                continue
+            if dtype.hasobject:
+                continue
+            arrays[info.filename[:-len(".npy")]] = (dtype, shape, "F" if fortranOrder else "C", f.tell())
+    return arrays
+
+
+def _mapArray(fileName, dtype, shape, order, offset) -> np.ndarray:
+    """
+    Returns a read-only memmap of an array found by _storedArrays.
+    """
+    if 0 in shape: # An empty file region cannot be mapped.
+        return np.empty(shape, dtype = dtype)
+    return np.memmap(fileName, dtype = dtype, mode = "r", offset = offset, shape = shape, order = order)
+
+
+def districtColumn(districts, name) -> np.ndarray:
+    """
+    Returns one attribute of every district as an array, from a DistrictStore
+    without building the districts, or from a list of districts.
+
+    Numeric columns have NaN for None; other columns are object arrays.
+    """
+    if isinstance(districts, DistrictStore):
+        return districts.column(name)
+    return _withMissing(*_toColumn([getattr(d, name, None) for d in districts]))
+
+
+def saveDistricts(fileName, districts) -> None:
+    """
+    Writes districts to a columnar .npz file.
+
+    Every scalar attribute becomes one NumPy column (a column with None
+    values also gets a "none:" mask column); a text column is stored as the
+    UTF-8 bytes of all its values with a "text:" offsets column, instead of
+    a fixed-width array padded to its longest value. The vertices of all rings
+    of all parts are stored in one flat (n, 2) buffer, with three levels of
+    offsets: district i has the polygons
+    districtOffsets[i]:districtOffsets[i+1], polygon j has the rings
+    polygonOffsets[j]:polygonOffsets[j+1], and ring k has the vertices
+    vertices[ringOffsets[k]:ringOffsets[k+1]].
+
+    The archive is not compressed, so DistrictStore can memory-map every
+    column instead of inflating it.
+
+    Parameters
+    ----------
+    fileName : str
+        The .npz file to write.
+    districts : list of DetroitDistrict
+        The districts to save.
+    """
+    districts = list(districts)
+    names = []
+    for d in districts:
+        names.extend(name for name in vars(d) if name not in ("coordinates", "parts") and name not in names)
+
+    arrays = {}
+    for name in names:
+        column, missing = _toColumn([getattr(d, name, None) for d in districts])
+        if column.dtype.kind == "U":
+            arrays[name], arrays[TEXT_PREFIX + name] = _packText(column.tolist())
+        else:
+            arrays[name] = column
+        if missing is not None:
+            arrays[NONE_PREFIX + name] = missing
+
+    polygons = [polygon for d in districts for polygon in d.parts]
+    rings = [ring for polygon in polygons for ring in polygon]
+    counts = {
+        "districtOffsets": [len(d.parts) for d in districts],
+        "polygonOffsets": [len(polygon) for polygon in polygons],
+        "ringOffsets": [len(ring) for ring in rings],
+    }
+    for name, lengths in counts.items():
+        arrays[name] = np.concatenate([[0], np.cumsum(lengths, dtype = np.int64)]).astype(np.int64)
+    points = [point[:2] for ring in rings for point in ring]
+    arrays["vertices"] = np.array(points, dtype = np.float64).reshape(-1, 2)
+    np.savez(fileName, **arrays)
+
+
+class DistrictStore(Sequence):
+    """
+    A read-only sequence of districts backed by a columnar .npz file (see saveDistricts).
+
+    Columns are memory-mapped from the file (see _storedArrays) and only read
+    when used; a text value is decoded on its own when one district is
+    built, and a whole text column when column() asks for it. DetroitDistrict objects
+    are only built when they are indexed, so a caller that needs a few
+    columns (e.g. income statistics) never parses the polygons. Built
+    districts are kept, and column() returns their current values, so
+    changes made through the objects are seen by both.
+
+    Parameters
+    ----------
+    fileName : str
+        The .npz file.
+    districtClass : type
+        The class to build, DetroitDistrict.
+    """
+
+    def __init__(self, fileName, districtClass) -> None:
+        self.fileName = fileName
+        self.districtClass = districtClass
+        self.data = np.load(fileName) # For the compressed members of older files.
+        self.stored = _storedArrays(fileName)
+        self.arrays = {}
+        self.names = [name for name in self.data.files if name not in GEOMETRY
+                      and not name.startswith(NONE_PREFIX) and not name.startswith(TEXT_PREFIX)]
+        self.columns = {}
+        self.districts = {}
+
+    def _array(self, name):
+        if name not in self.arrays:
+            if name in self.stored:
+                self.arrays[name] = _mapArray(self.fileName, *self.stored[name])
+            else:
+                self.arrays[name] = self.data[name]
+        return self.arrays[name]
+
+    def _rawColumn(self, name):
+        if name not in self.columns:
+            if TEXT_PREFIX + name in self.data.files:
+                self.columns[name] = _unpackText(self._array(name), self._array(TEXT_PREFIX + name))
+            else:
+                self.columns[name] = self._array(name)
+        return self.columns[name]
+
+    def _value(self, name, i):
+        missing = NONE_PREFIX + name
+        if missing in self.data.files and self._array(missing)[i]:
+            return None
+        if TEXT_PREFIX + name in self.data.files and name not in self.columns:
+            return _unpackText(self._array(name), self._array(TEXT_PREFIX + name), i)
+        value = self._rawColumn(name)[i]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def __len__(self) -> int:
+        return len(self._rawColumn("districtOffsets")) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("district index out of range")
+        if i not in self.districts:
+            parts = [[ring.tolist() for ring in polygon] for polygon in self._parts(i)]
+            values = {name: self._value(name, i) for name in self.names}
+            district = self.districtClass(parts[0][0] if parts else [], values.pop("holcGrade", None),
+                                          values.pop("id", None), values.pop("description", None),
+                                          parts = parts)
+            for name, value in values.items():
+                setattr(district, name, value)
+            self.districts[i] = district
+        return self.districts[i]
+
+    def column(self, name) -> np.ndarray:
+        """
+        Returns one attribute of every district as an array, without building the districts.
+
+        Numeric columns have NaN for None; other columns are object arrays.
+        """
+        if name not in self.names:
+            values = np.full(len(self), None, dtype = object)
+        else:
+            missing = NONE_PREFIX + name
+            values = _withMissing(self._rawColumn(name),
+                                  self._rawColumn(missing) if missing in self.data.files else None)
+        if self.districts: # The built districts may have changed.
+            changed = list(self.districts)
+            current, currentMissing = _toColumn([getattr(self.districts[i], name, None) for i in changed])
+            current = _withMissing(current, currentMissing)
+            if values.dtype.kind != current.dtype.kind:
+                values = values.astype(object if "O" in (values.dtype.kind, current.dtype.kind) else np.float64)
+            values[changed] = current
+        return values
+
+    def _parts(self, i) -> list:
+        """
+        Returns the polygons of district i as lists of (n, 2) ring arrays (views of the vertex buffer).
+        """
+        districtOffsets = self._rawColumn("districtOffsets")
+        polygonOffsets = self._rawColumn("polygonOffsets")
+        ringOffsets = self._rawColumn("ringOffsets")
+        vertices = self._rawColumn("vertices")
+        return [[vertices[ringOffsets[k]:ringOffsets[k + 1]] for k in range(polygonOffsets[j], polygonOffsets[j + 1])]
+                for j in range(districtOffsets[i], districtOffsets[i + 1])]
+
+    def rings(self) -> list:
+        """
+        Returns the rings of every district as (n, 2) arrays, without building the districts.
+        """
+        return [self.districts[i].rings() if i in self.districts
+                else [ring for polygon in self._parts(i) for ring in polygon]
+                for i in range(len(self))]
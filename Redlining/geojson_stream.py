@@ -0,0 +1,114 @@
+import json
+
+_decoder = json.JSONDecoder()
+_whitespace = " \t\n\r"
+
+
+class _Reader:
+    """
+    A buffered text reader that decodes one JSON value at a time.
+
+    Only the unread part of the file is kept in the buffer, so memory is
+    bounded by the chunk size plus the largest single value decoded.
+    """
+
+    def __init__(self, f, chunkSize) -> None:
+        self.f = f
+        self.chunkSize = chunkSize
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """
+        Appends the next chunk to the buffer, dropping the consumed part. False at end of file.
+        """
+        if self.eof:
+            return False
+        # Reading at least as much as is pending keeps a large value linear to decode.
+        chunk = self.f.read(max(self.chunkSize, len(self.buffer) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character ("" at end of file).
+        """
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _whitespace:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} of the buffer")
+        self.pos += 1
+
+    def value(self):
+        """
+        Decodes the next JSON value, reading more chunks until it is complete.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill(): # Not a truncated value, a broken file.
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk.
+            if end == len(self.buffer) and not self.eof and isinstance(value, (int, float)):
+                if self._fill():
+                    continue
+            self.pos = end
+            return value
+
+
+def iterFeatures(fileName, chunkSize = 1 << 16):
+    """
+    Yields the features of a GeoJSON FeatureCollection one at a time.
+
+    The file is read in chunks with the standard library decoder: the
+    top-level object is walked key by key, and the "features" array is
+    decoded one element at a time, so memory stays flat however large the
+    file is.
+
+    Parameters
+    ----------
+    fileName : str
+        The GeoJSON file.
+    chunkSize : int, optional
+        The number of characters read at a time.
+
+    Yields
+    ------
+    dict
+        One GeoJSON feature.
+    """
+    f = open(fileName, encoding = "utf-8")
+    try:
+        reader = _Reader(f, chunkSize)
+        reader.expect("{")
+        while reader.peek() != "}":
+            key = reader.value()
+            reader.expect(":")
+            if key != "features":
+                reader.value() # Skip "type", "crs" and the like.
+            else:
+                reader.expect("[")
+                while reader.peek() != "]":
+                    yield reader.value()
+                    if reader.peek() == ",":
+                        reader.pos += 1
+                reader.expect("]")
+            if reader.peek() == ",":
+                reader.pos += 1
+    finally:
+        f.close()
@@ -4,11 +4,14 @@ import os
 import random
 import matplotlib.pyplot as plt
 import matplotlib
-from matplotlib.path import Path
 random.seed(17)
-import requests
-from collections import Counter
-import re
+from district_geometry import PolygonSet, GridIndex
+from census_client import CensusClient, CensusError
+from response_cache import ResponseCache
+from district_store import DistrictStore, saveDistricts, districtColumn
+from district_stats import GroupedStats, descendingRanks
+from word_counts import countGroups, tfidf
+from geojson_stream import iterFeatures
 
 class DetroitDistrict:
     """
@@ -47,6 +50,16 @@ class DetroitDistrict:
     censusTract : str, optional
         Census tract code for the district (default is None).
 
+    percent : float, optional
+        The share of Black or African American residents of the census tract, see calcPopu (default is None).
+
+    rank : int, optional
+        The rank of the district by median income, 1 being the highest, see calcRank (default is None).
+
+    parts : list of list of list of lists, optional
+        All the polygons of the (MultiPolygon) district, each a list of rings
+        (outer boundary first, then holes). Default is [[coordinates]].
+
 
     Attributes
     ------------------------------
@@ -66,6 +79,9 @@ class DetroitDistrict:
     self.randomLong 
     self.medIncome 
     self.censusTract 
+    self.percent 
+    self.rank 
+    self.parts 
 
 
     """
@@ -76,7 +92,7 @@ class DetroitDistrict:
         "D": "maroon"
     }
     
-    def __init__(self, coordinates, holcGrade, id, description, holcColor = None, randomLat=None, randomLong=None, medIncome=None, censusTract=None):
+    def __init__(self, coordinates, holcGrade, id, description, holcColor = None, randomLat=None, randomLong=None, medIncome=None, censusTract=None, percent=None, rank=None, parts=None):
         self.coordinates = coordinates
         self.holcGrade = holcGrade
         self.id = id
@@ -86,6 +102,40 @@ class DetroitDistrict:
         self.randomLong = randomLong
         self.medIncome = medIncome
         self.censusTract = censusTract
+        self.percent = percent
+        self.rank = rank
+        self.parts = parts if parts is not None else [[coordinates]]
+
+    def rings(self):
+        """
+        Returns every ring of every part of the district, for the even-odd point tests.
+        """
+        return [ring for polygon in self.parts for ring in polygon]
+
+
+def iterDistricts(fileName):
+    """
+    Yields one DetroitDistrict per feature of a HOLC GeoJSON file, reading it
+    incrementally (see geojson_stream.iterFeatures), so memory does not grow
+    with the file.
+
+    coordinates is the outer ring of the first polygon, as before, and parts
+    keeps every polygon of a MultiPolygon with its holes.
+    """
+    for feature in iterFeatures(fileName):
+        geom = feature.get("geometry")
+        prop = feature.get("properties")
+        parts = geom.get("coordinates")
+        if geom.get("type") == "Polygon":
+            parts = [parts]
+        coordinates = list(parts[0][0]) # Three layers.
+
+        holcGrade = prop.get("holc_grade")
+        id = prop.get("holc_id")
+        desc = prop.get("area_description_data")
+        description  = desc.get("8")
+
+        yield DetroitDistrict(coordinates, holcGrade, id, description, parts = parts)
 
 
 
@@ -96,16 +146,47 @@ class RedLines:
     Attributes
     ----------
     districts : list of DetroitDistrict
-        A list to store instances of DetroitDistrict.
+        A list to store instances of DetroitDistrict, or a DistrictStore that
+        builds them on demand when loaded from a .npz cache.
+
+    polygons : PolygonSet
+        The district polygons packed into NumPy arrays, built with the districts.
+
+    index : GridIndex
+        The spatial index over polygons, used by locate.
+
+    districtIds : numpy.ndarray of object
+        The id of every district and a trailing None, built with index and returned by locate.
+
+    client : CensusClient
+        The HTTP client for the FCC and Census Bureau APIs.
+
+    state : str
+        The FIPS code of the state of the city, used for the ACS tables (26 is Michigan).
+
+    incomeStats : GroupedStats
+        The median incomes grouped by HOLC grade, built on first use by
+        calcIncomeStats and kept up to date by setIncome.
 
     """
 
-    def __init__(self,cacheFile = None):
+    def __init__(self,cacheFile = None, client = None, state = "26"):
         """
         Initializes the RedLines class without any districts.
         assign districts attribute to an empty list
+        A CensusClient can be passed in, e.g. one pointing at a local test server.
+        state is the FIPS code of the city's state; the default is Michigan, for Detroit.
+        By default API responses are cached in redlines_requests.sqlite, so a rerun
+        only goes to the network for the lookups that failed or expired. The file
+        is created by the first lookup, not here.
         """
         self.districts = []
+        self.client = client or CensusClient(cache = ResponseCache("redlines_requests.sqlite"))
+        self.state = state
+        self.incomeStats = None
+        self.polygons = None
+        self.index = None
+        self.districtIds = None
         if cacheFile:
             self.loadCache(cacheFile)
         
@@ -128,29 +209,57 @@ class RedLines:
         The data for description attribute could be from  
         one of the dict key with only number.
 
+        The file is parsed one feature at a time, see iterDistricts.
+
         """
-        f = open(fileName)
-        data = json.load(f)
-        f.close()
-        features = data.get("features") # Get the item from the dict with the key "features"
-        districts = [] # Define an empty list for storing the districts instance.
-        for feature in features:
-            geom = feature.get("geometry")
-            prop = feature.get("properties")
-            coordinates = []
-            coords = geom.get("coordinates")
-            for point in coords[0][0]: # Three layers.
-                coordinates.append(point) # Extract coordinates.
-            
-            holcGrade = prop.get("holc_grade")
-            id = prop.get("holc_id")
-            desc = prop.get("area_description_data")
-            description  = desc.get("8")
-            
-            d = DetroitDistrict(coordinates, holcGrade, id, description) # Initialize the district instance.
-            districts.append(d)
-        
-        self.districts = districts
+        self.districts = list(iterDistricts(fileName))
+        self.incomeStats = None
+        self.buildIndex()
+
+    def buildIndex(self):
+        """
+        Packs the district polygons into a PolygonSet and builds the GridIndex over them,
+        with the district ids that locate returns. Called whenever the districts are loaded.
+        """
+        if isinstance(self.districts, DistrictStore):
+            districtRings = self.districts.rings() # Straight from the vertex buffer.
+        else:
+            districtRings = [d.rings() for d in self.districts]
+        self.polygons = PolygonSet(districtRings)
+        self.index = GridIndex(self.polygons)
+        # Read as a column, so a DistrictStore builds no districts; the trailing None is for -1.
+        self.districtIds = np.append(districtColumn(self.districts, "id").astype(object), None)
+
+    def bounds(self):
+        """
+        Returns the bounding box (minLong, minLat, maxLong, maxLat) of all districts,
+        derived from their polygons.
+        """
+        if self.polygons is None:
+            self.buildIndex()
+        low = np.nanmin(self.polygons.bounds[:, :2], axis = 0)
+        high = np.nanmax(self.polygons.bounds[:, 2:], axis = 0)
+        return (float(low[0]), float(low[1]), float(high[0]), float(high[1]))
+
+    def locate(self, points):
+        """
+        Finds the district that contains every point, for a whole array of points at once.
+
+        Parameters
+        ----------
+        points : array-like of float, shape (n, 2)
+            The (longitude, latitude) points, in the order of the district coordinates.
+
+        Returns
+        -------
+        numpy.ndarray of object
+            The id of the containing district of every point, None if the point
+            is in no district.
+        """
+        if self.index is None:
+            self.buildIndex()
+        found = self.index.locate(points)
+        return self.districtIds[found] # -1 picks the trailing None.
 
     def plotDistricts(self):
         """
@@ -173,8 +282,12 @@ class RedLines:
         """
         Generates a random point within the boundaries of each district.
 
-        This method creates a mesh grid of points covering the geographical area of interest
-        and then selects a random point within the boundary of each district.
+        All districts are packed into one PolygonSet, and every district draws
+        candidate points uniformly in its own bounding box until one falls
+        inside the polygon (rejection sampling). Each round tests the
+        candidates of all remaining districts in one NumPy call, so the cost
+        scales with the districts' sizes instead of a fixed grid over the
+        whole city, and thin districts that a grid would miss still get a point.
 
         Attributes
         ----------
@@ -185,20 +298,17 @@ class RedLines:
         ----
         The random point is assigned as the randomLat and randomLong  for each district.
         This method assumes the 'self.districts' attribute has been populated with DetroitDistrict instances.
+        The points are reproducible under random.seed, which seeds the NumPy generator.
 
         """
-        xgrid = np.arange(-83.5, -82.8, .004)
-        ygrid = np.arange(42.1, 42.6, .004)
-        xmesh, ymesh = np.meshgrid(xgrid, ygrid)
-        
-        points = np.vstack((xmesh.flatten(), ymesh.flatten())).T
-        
-        for d in self.districts:
-            vertices = np.asarray(d.coordinates, dtype = float) # Convert to numpy array
-            p = Path(vertices)
-            grid = p.contains_points(points)
-            point = points[random.choice((np.where(grid)[0]).tolist())]
-            print(d, " : ", point)
+        if self.polygons is None:
+            self.buildIndex()
+        rng = np.random.default_rng(random.getrandbits(64))
+        points = self.polygons.samplePoints(rng)
+
+        for d, point in zip(self.districts, points):
+            if np.isnan(point).any(): # A district without area.
+                continue
             d.randomLong = float(point[0])
             d.randomLat = float(point[1])
 
@@ -214,16 +324,12 @@ class RedLines:
 
         Note
         ----
-        The method fetches data from "https://geo.fcc.gov/api/census/area" and assumes that 
+        The method fetches data from the FCC API (client.fccUrl) and assumes that 
         `randomLat` and `randomLong` attributes of each district are already set.
 
-        The function `fetch` is an internal helper function that performs the actual API request.
-
-        In the api call, check if the response.status_code is 200.
-        If not, it might indicate the api call made is not correct, check your api call parameters.
-
-        If you get status_code 200 and other code alternativly, it could indicate the fcc webiste is not 
-        stable. Using a while loop to make anther api request in fetch function, until you get the correct result. 
+        The lookups run concurrently through self.client, which retries a failed
+        request with exponential backoff a limited number of times. A district whose
+        lookup still fails keeps censusTract None instead of stopping the run.
 
         Important
         -----------
@@ -232,26 +338,9 @@ class RedLines:
         'lat': xxx,'lon': xxx,'censusYear': xxx
 
         """
-        def fetch(lat, lon, year = 2010): # Use 2010 since later we will use data in year 2018. 
-            url = "https://geo.fcc.gov/api/census/area"
-            parameters = {
-                'lat': lat,
-                'lon': lon,
-                'censusYear': year,
-                'format': 'json'
-            }
-            while True: # Use a while loop to make sure that we get the API response with status_code 200.
-                try:
-                    response = requests.get(url, params = parameters)
-                    if response.status_code == 200:
-                        data = response.json()
-                        FIPS = data["results"][0]["block_fips"]
-                        return FIPS[2:11] # Extract the census tract from the FIPS code.
-                except Exception:
-                    continue
-        
-        for d in self.districts:
-            census_Tract = fetch(d.randomLat, d.randomLong)
+        # Use 2010 since later we will use data in year 2018. 
+        tracts = self.client.fetchTracts([(d.randomLat, d.randomLong) for d in self.districts], 2010)
+        for d, census_Tract in zip(self.districts, tracts):
             d.censusTract = census_Tract 
 
     def fetchIncome(self):
@@ -260,7 +349,7 @@ class RedLines:
         Retrieves the median household income for each district based on the census tract.
 
         This method requests income data from the ACS 5-Year Data via the U.S. Census Bureau's API 
-        for the year 2018. It then maps these incomes to the corresponding census tracts and updates 
+        for the year 2018 (client.acsUrl). It then maps these incomes to the corresponding census tracts and updates 
         the median income attribute of each district in `self.districts`.
 
         Note
@@ -270,18 +359,9 @@ class RedLines:
         is not available or is negative, the median income is set to 0.
 
         """
-        url = "https://api.census.gov/data/2018/acs/acs5"
-        parameters = {
-            "get": "B19013_001E",
-            "for": "tract:*",
-            "in": "state:26"
-        }
-        
         try:
-            response = requests.get(url, params = parameters)
-            if response.status_code == 200:
-                data = response.json()
-        except Exception as e:
+            data = self.client.fetchTable("B19013_001E", state = self.state)
+        except CensusError:
             return
         
         income_dict = {}
@@ -297,6 +377,7 @@ class RedLines:
         
         for d in self.districts:
             d.medIncome = income_dict.get(d.censusTract)
+        self.incomeStats = None
         
         
         
@@ -308,11 +389,17 @@ class RedLines:
         After creating the list, dump it to a json file with the inputted name.
         You should name the cache file as redlines_cache.json
 
+        A file name ending in .npz is written in the columnar format instead,
+        see district_store.saveDistricts, which loadCache reads lazily.
+
         Parameters
         ----------
         filename : str
             The name of the file where the district data will be saved.
         """
+        if fileName.endswith(".npz"):
+            saveDistricts(fileName, self.districts)
+            return
         district_dict_list = []
         for d in self.districts:
             district_dict_list.append(d.__dict__)
@@ -331,12 +418,24 @@ class RedLines:
         fileName : str
             The name of the file from which to load the district data.
             You should name the cache file as redlines_cache.json
+            A .npz file from cacheData is opened as a DistrictStore: columns
+            are read when first used and districts are built when accessed.
 
         Returns
         -------
         bool
             True if the data was successfully loaded, False otherwise.
         """
+        if fileName.endswith(".npz"):
+            try:
+                self.districts = DistrictStore(fileName, DetroitDistrict)
+            except (OSError, ValueError, KeyError):
+                return False
+            self.incomeStats = None
+            self.polygons = None # Built on first use, see buildIndex.
+            self.index = None
+            self.districtIds = None
+            return True
         try:
             f = open(fileName) # The mode is by default "r".
             data = json.load(f)
@@ -348,12 +447,18 @@ class RedLines:
                     d.get("holcGrade"),
                     d.get("id"),
                     d.get("description"),
-                    d.get("randomLat"),
-                    d.get("randomLong"),
-                    d.get("medIncome"), 
-                    d.get("censusTract")
+                    holcColor = d.get("holcColor"),
+                    randomLat = d.get("randomLat"),
+                    randomLong = d.get("randomLong"),
+                    medIncome = d.get("medIncome"), 
+                    censusTract = d.get("censusTract"),
+                    percent = d.get("percent"),
+                    rank = d.get("rank"),
+                    parts = d.get("parts")
                 )
                 self.districts.append(district)
+            self.incomeStats = None
+            self.buildIndex()
             return True
         except Exception:
             return False
@@ -361,10 +466,11 @@ class RedLines:
 
     def calcIncomeStats(self):
         """
-        Use np.median and np.mean to
         Calculates the mean and median of median household incomes for each district grade (A, B, C, D).
 
-        This method computes the mean and median incomes for districts grouped by their HOLC grades.
+        This method computes the mean and median incomes for districts grouped by their HOLC grades,
+        all grades at once from one sorted income column (see incomeStatistics); districts
+        without an income are left out.
         The results are stored in a list following the pattern: [AMean, AMedian, BMean, BMedian, ...].
         After your calculations, you need to round the result to the closest whole int.
         Relate reading https://www.w3schools.com/python/ref_func_round.asp
@@ -375,27 +481,40 @@ class RedLines:
         list
             A list containing mean and median income values for each district grade in the order A, B, C, D.
         """
-        grades = {
-            "A": [],
-            "B": [],
-            "C": [],
-            "D": [],
-        }
+        stats = self.incomeStatistics()
+        means, medians = stats.mean(), stats.median()
         results = []
-        for d in self.districts:
-            grades[d.holcGrade].append(d.medIncome)
         
-        for grade in ["A", "B", "C", "D"]:
-            mean_income = round(np.mean(grades[grade]))
-            median_income = round(np.median(grades[grade]))
-            results.append(mean_income)
-            results.append(median_income)
+        for k in range(len(stats)):
+            results.append(round(means[k]))
+            results.append(round(medians[k]))
         
         return results
+
+    def incomeStatistics(self):
+        """
+        Returns the median incomes grouped by HOLC grade A, B, C, D (see GroupedStats),
+        building them on first use. Districts without an income are left out.
+        """
+        if self.incomeStats is None:
+            # Only the two columns are needed, so a lazily loaded cache builds no districts.
+            holcGrades = districtColumn(self.districts, "holcGrade")
+            incomes = districtColumn(self.districts, "medIncome")
+            self.incomeStats = GroupedStats(holcGrades, incomes, groups = ["A", "B", "C", "D"])
+        return self.incomeStats
+
+    def setIncome(self, i, income):
+        """
+        Sets the median income of district i, updating only the statistics of its grade.
+        Use it instead of assigning medIncome, which the statistics would not see.
+        """
+        self.districts[i].medIncome = income
+        if self.incomeStats is not None:
+            self.incomeStats.update(i, income)
             
 
 
-    def findCommonWords(self):
+    def findCommonWords(self, n = 1, useTfidf = False, workers = None, count = 10):
         """
         Analyzes the qualitative descriptions of each district category (A, B, C, D) and identifies the
         10 most common words unique to each category.
@@ -404,6 +523,22 @@ class RedLines:
         words, and computes the frequency of each word. It then identifies and returns the 10 most 
         common words that are unique to each category, excluding common English filler words.
 
+        Every description is tokenized as a stream and counted on its own (see
+        word_counts.countGroups, in a process pool if workers > 1), and the
+        per-district counts are merged per grade.
+
+        Parameters
+        ----------
+        n : int, optional
+            Count n-grams of n words (after the filler words are removed) instead of single words.
+        useTfidf : bool, optional
+            Rank by the TF-IDF score of every grade (see word_counts.tfidf) instead of the raw
+            frequency, so words frequent in every grade rank lower.
+        workers : int, optional
+            The number of worker processes counting the descriptions; None counts in this process.
+        count : int, optional
+            The number of words per category.
+
         Returns
         -------
         list of lists
@@ -420,35 +555,23 @@ class RedLines:
         - Counter from collections could also be used.
 
         """
-        # List of common filler words to exclude, you could add more if needed.
-        filler_words = set(['the', 'of', 'and', 'in', 'to', 'a', 'is', 'for', 'on', 'that'])
-
-        grades = {
-            "A": "",
-            "B": "",
-            "C": "",
-            "D": "",
-        }
-        
-        for d in self.districts:
-            grades[d.holcGrade] += " " + d.description.lower() # Use lower for easy later counting.
-        
-        grade_counts = {}
-        
-        for grade, grade_description in grades.items():
-            words = re.findall(r"[a-z]+", grade_description) # Use the regular expression to extract words.
-            filtered_words = [word for word in words if word not in filler_words]
-            grade_counts[grade] = Counter(filtered_words) # Count the frequency of each word.
+        grades = ["A", "B", "C", "D"]
+        # Only the two columns are needed, so a lazily loaded cache builds no districts.
+        holcGrades = districtColumn(self.districts, "holcGrade")
+        descriptions = districtColumn(self.districts, "description")
+        grade_counts = countGroups(holcGrades, descriptions, grades, n = n, workers = workers)
+        if useTfidf:
+            grade_counts = tfidf(grade_counts)
         
         used_words = set() # To track words already used in previous grades.
         unique_common_words = []
-        for grade in ["A", "B", "C", "D"]:
+        for grade in grades:
             most_common = []
             for word, _ in grade_counts[grade].most_common():
                 if word not in used_words:
                     most_common.append(word)
                     used_words.add(word) # Set uses "add" to add new item.
-                if len(most_common) == 10:
+                if len(most_common) == count:
                     break
             unique_common_words.append(most_common)
         
@@ -475,23 +598,27 @@ class RedLines:
         ----
         rank
 
-        """
-        
+        The ranks come from one argsort over the income column; districts
+        without an income get None.
 
-        pass
+        """
+        incomes = districtColumn(self.districts, "medIncome")
+        ranks = descendingRanks(incomes)
+        for d, income, rank in zip(self.districts, incomes, ranks):
+            d.rank = None if np.isnan(income) else int(rank)
 
     def calcPopu(self):
         """
         Fetches and calculates the percentage of Black or African American residents in each district.
 
-        This method fetch the total and Black populations for each census tract in Michigan from 
+        This method fetch the total and Black populations for each census tract in the state (Michigan for Detroit) from 
         the U.S. Census Bureau's API, like the median income data.  It then calculates the percentage of Black residents in each tract
         and assigns this value to the corresponding district percent attribute.
 
         Note
         ----
         The method assumes that the census tract IDs in the district data match those used by the Census Bureau.
-        The percentage is rounded to two decimal places. If the Black population is zero, the percentage is set to 0. 
+        The percentage is a share between 0 and 1, rounded to two decimal places. If the Black population is zero, the percentage is set to 0. 
         Elif the total population is zero, the percentage is set to 1.
 
         Important:
@@ -504,7 +631,26 @@ class RedLines:
         percent
 
         """
-        pass
+        # B02001_001E is the total population, B02001_003E the Black or African American alone.
+        try:
+            data = self.client.fetchTable("B02001_001E,B02001_003E", state = self.state)
+        except CensusError:
+            return
+
+        percent_dict = {}
+        for row in data[1:]: # The first row is the header.
+            total = float(row[0])
+            black = float(row[1])
+            if black <= 0:
+                percent = 0
+            elif total <= 0:
+                percent = 1
+            else:
+                percent = round(black / total, 2)
+            percent_dict[row[3] + row[4]] = percent # County + tract.
+
+        for d in self.districts:
+            d.percent = percent_dict.get(d.censusTract)
 
 
     def comment(self):
@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from red_lines import RedLines
+from census_client import CensusClient, FCC_URL, ACS_URL
+from response_cache import ResponseCache
+from district_store import districtColumn
+from district_stats import GroupedStats
+
+Grades = ["A", "B", "C", "D"]
+
+
+def gradeStats(holcGrades, incomes) -> dict:
+    """
+    Summarizes the incomes of every HOLC grade, skipping the districts without an income.
+
+    Returns
+    -------
+    dict
+        {grade: {"districts", "withIncome", "mean", "median"}}; mean and
+        median are None for a grade without incomes.
+    """
+    summary = GroupedStats(holcGrades, incomes, groups = Grades).summary()
+    return {grade: {"districts": int((holcGrades == grade).sum()),
+                    "withIncome": summary[grade]["count"],
+                    "mean": None if summary[grade]["mean"] is None else round(summary[grade]["mean"]),
+                    "median": None if summary[grade]["median"] is None else round(summary[grade]["median"])}
+            for grade in Grades}
+
+
+def runCity(city, options) -> dict:
+    """
+    Runs load -> sample -> census lookup -> income join -> stats for one city.
+
+    This is the task of a worker process, so it builds its own RedLines and
+    CensusClient; the response cache file is shared by all workers.
+
+    Parameters
+    ----------
+    city : dict
+        {"name": ..., "file": HOLC GeoJSON file, "state": state FIPS code}.
+    options : dict
+        {"fccUrl", "acsUrl", "cache" (SQLite file or None), "fetch" (bool), "seed"}.
+
+    Returns
+    -------
+    dict
+        The city report, and the incomes per grade for the national merge.
+    """
+    start = time.perf_counter()
+    random.seed(f"{options['seed']}:{city['name']}") # Reproducible whatever worker runs the city.
+    cache = ResponseCache(options["cache"]) if options["cache"] else None
+    client = CensusClient(fccUrl = options["fccUrl"], acsUrl = options["acsUrl"], cache = cache)
+    myRedLines = RedLines(client = client, state = city["state"])
+    myRedLines.createDistricts(city["file"])
+    myRedLines.generateRandPoint()
+    if options["fetch"]:
+        myRedLines.fetchCensus()
+        myRedLines.fetchIncome()
+
+    holcGrades = districtColumn(myRedLines.districts, "holcGrade")
+    incomes = districtColumn(myRedLines.districts, "medIncome").astype(np.float64)
+    return {
+        "name": city["name"],
+        "state": city["state"],
+        "districts": len(myRedLines.districts),
+        "bounds": myRedLines.bounds(),
+        "failedLookups": sum(d.censusTract is None for d in myRedLines.districts) if options["fetch"] else None,
+        "grades": gradeStats(holcGrades, incomes),
+        "seconds": time.perf_counter() - start,
+        "incomes": {grade: incomes[(holcGrades == grade) & ~np.isnan(incomes)].tolist() for grade in Grades},
+    }
+
+
+def runPipeline(cities, workers = None, fccUrl = FCC_URL, acsUrl = ACS_URL,
+                cache = "redlines_requests.sqlite", fetch = True, seed = 17) -> dict:
+    """
+    Runs runCity for many cities in a process pool and merges them into one national report.
+
+    Parameters
+    ----------
+    cities : list of dict
+        The cities, see runCity.
+    workers : int, optional
+        The number of worker processes. Default is one per CPU.
+    fccUrl, acsUrl : str, optional
+        The API endpoints, see CensusClient.
+    cache : str, optional
+        The shared SQLite response cache; None disables it.
+    fetch : bool, optional
+        If False, skip the census lookups (load, sample and bounds only).
+    seed : int, optional
+        The seed of the random district points.
+
+    Returns
+    -------
+    dict
+        {"cities": [city reports], "national": {grade stats over all districts}}.
+    """
+    options = {"fccUrl": fccUrl, "acsUrl": acsUrl, "cache": cache, "fetch": fetch, "seed": seed}
+    with ProcessPoolExecutor(max_workers = workers) as executor:
+        reports = list(executor.map(runCity, cities, [options] * len(cities)))
+
+    holcGrades, incomes = [], []
+    for report in reports:
+        for grade, values in report.pop("incomes").items():
+            holcGrades.extend([grade] * len(values))
+            incomes.extend(values)
+    national = gradeStats(np.array(holcGrades, dtype = object), np.array(incomes, dtype = np.float64))
+    for grade in Grades: # Count every district, including those without an income.
+        national[grade]["districts"] = sum(report["grades"][grade]["districts"] for report in reports)
+    return {"cities": reports, "national": national}
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Run the RedLines analysis for many cities at once.")
+    parser.add_argument("config", help = 'A JSON list of cities: [{"name": ..., "file": ..., "state": ...}].')
+    parser.add_argument("--workers", type = int, default = None)
+    parser.add_argument("--fcc-url", default = FCC_URL)
+    parser.add_argument("--acs-url", default = ACS_URL)
+    parser.add_argument("--cache", default = "redlines_requests.sqlite")
+    parser.add_argument("--no-fetch", action = "store_true", help = "Skip the census lookups.")
+    parser.add_argument("--seed", type = int, default = 17)
+    parser.add_argument("--output", default = None, help = "The JSON report file. Default is stdout.")
+    args = parser.parse_args()
+
+    f = open(args.config)
+    cities = json.load(f)
+    f.close()
+    base = os.path.dirname(os.path.abspath(args.config))
+    for city in cities: # City files are relative to the config file.
+        city["file"] = os.path.join(base, city["file"])
+
+    report = runPipeline(cities, args.workers, args.fcc_url, args.acs_url, args.cache,
+                         not args.no_fetch, args.seed)
+    if args.output is None:
+        print(json.dumps(report, indent = 4))
+    else:
+        f = open(args.output, mode = "w")
+        json.dump(report, f, indent = 4)
+        f.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+def normalizeParams(params, precision = 5) -> list:
+    """
+    Returns the request parameters in a canonical form for cache keys:
+    sorted by name, with floats (e.g. lat/lon) rounded to precision decimals
+    (5 decimals is about 1 m), so nearby points of the same district share an entry.
+    """
+    normalized = []
+    for name, value in sorted(params.items()):
+        if isinstance(value, float):
+            value = round(value, precision)
+        normalized.append([name, str(value)])
+    return normalized
+
+
+def requestKey(url, params, precision = 5) -> str:
+    """
+    Returns the content address of a request: the SHA-256 of its endpoint and normalized parameters.
+    """
+    text = json.dumps([url, normalizeParams(params, precision)])
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    A persistent cache of JSON API responses in a SQLite file.
+
+    Entries are keyed by requestKey, expire ttl seconds after they were
+    fetched, and the least recently used ones are evicted when there are more
+    than maxEntries. It is safe to use from several threads, and several
+    processes can share the file (e.g. the workers of redlines_pipeline).
+
+    The number of rows is counted once when the file is opened and then kept
+    up to date by every new row and eviction, so a put costs no table scan.
+    Rows added by other processes are picked up by a recount every
+    RecountInterval new rows.
+
+    The file is only opened (and created) by the first call that needs it,
+    so building a cache that is never used leaves no file behind. A database
+    that stays locked by another process for longer than timeout is treated
+    as a miss by get and skipped by put, and counted in errors: the cache
+    never fails a request.
+
+    Parameters
+    ----------
+    fileName : str, optional
+        The SQLite file; ":memory:" keeps the cache in memory only.
+    ttl : float, optional
+        The lifetime of an entry in seconds. None never expires.
+    maxEntries : int, optional
+        The number of entries kept.
+    precision : int, optional
+        The decimals float parameters are rounded to in keys.
+    timeout : float, optional
+        How long to wait in seconds for a lock held by another connection.
+    """
+
+    # The number of new rows after which the row count is read from the table again.
+    RecountInterval = 1000
+
+    def __init__(self, fileName = "redlines_requests.sqlite", ttl = 30 * 24 * 3600,
+                 maxEntries = 100000, precision = 5, timeout = 5.0) -> None:
+        self.fileName = fileName
+        self.ttl = ttl
+        self.maxEntries = maxEntries
+        self.precision = precision
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._db = None
+        self._count = 0 # The rows in the table, as far as this connection knows.
+        self._added = 0 # The rows added since _count was last read from the table.
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Returns the database connection, opening the file and creating the table on first use.
+        Must be called with _lock held.
+        """
+        if self._db is None:
+            db = sqlite3.connect(self.fileName, timeout = self.timeout, check_same_thread = False)
+            try:
+                if self.fileName != ":memory:":
+                    # Readers do not block the writer (and the other way round) in WAL mode.
+                    db.execute("PRAGMA journal_mode = WAL")
+                db.execute("CREATE TABLE IF NOT EXISTS responses ("
+                           "key TEXT PRIMARY KEY, url TEXT, body TEXT, created REAL, accessed REAL)")
+                db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+                db.commit()
+                self._count = db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                self._added = 0
+            except sqlite3.OperationalError:
+                db.close()
+                raise
+            self._db = db
+        return self._db
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._count = self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            self._added = 0
+            return self._count
+
+    def get(self, url, params):
+        """
+        Returns the cached response of a request, or None if it is missing or expired.
+        """
+        key = requestKey(url, params, self.precision)
+        now = time.time()
+        with self._lock:
+            try:
+                db = self._connection()
+                row = db.execute("SELECT body, created FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                    db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    db.commit()
+                    self._count -= 1
+                    row = None
+                if row is not None:
+                    db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                    db.commit()
+            except sqlite3.OperationalError: # E.g. "database is locked".
+                self._rollback()
+                self.errors += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, url, params, value) -> None:
+        """
+        Stores the response of a request, evicting the least recently used entries if full.
+        """
+        key = requestKey(url, params, self.precision)
+        now = time.time()
+        with self._lock:
+            try:
+                db = self._connection()
+                body = json.dumps(value)
+                # The UPDATE takes the write lock, so no other process can insert the key in between.
+                updated = db.execute("UPDATE responses SET url = ?, body = ?, created = ?, accessed = ? "
+                                     "WHERE key = ?", (url, body, now, now, key)).rowcount
+                if not updated:
+                    db.execute("INSERT INTO responses VALUES (?, ?, ?, ?, ?)", (key, url, body, now, now))
+                    self._count += 1
+                    self._added += 1
+                if self._added >= self.RecountInterval:
+                    self._count = db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                    self._added = 0
+                if self._count > self.maxEntries: # The LIMIT query walks the accessed index, no scan.
+                    db.execute("DELETE FROM responses WHERE key IN ("
+                               "SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                               (self._count - self.maxEntries,))
+                    self._count = self.maxEntries
+                db.commit()
+            except sqlite3.OperationalError: # The response is just not cached.
+                self._rollback()
+                self.errors += 1
+
+    def _rollback(self) -> None:
+        """
+        Drops the unfinished transaction after a failed statement. Must be called with _lock held.
+        The row count may include a row that was rolled back, so the next put recounts.
+        """
+        self._added = self.RecountInterval
+        if self._db is not None:
+            try:
+                self._db.rollback()
+            except sqlite3.OperationalError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM responses")
+            self._db.commit()
+            self._count = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,110 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from census_client import CensusClient, CensusError
+from response_cache import ResponseCache
+
+OK_BODY = json.dumps({"results": [{"block_fips": "261635172001000"}]}).encode("utf-8")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    '''
+    Answers every GET with the next reply of the server's script:
+    "ok", "truncated" (a chunked body cut short), "badgzip" (a body that is
+    not the gzip it claims to be) or an HTTP status code.
+    '''
+
+    def do_GET(self) -> None:
+        self.server.requests += 1
+        reply = self.server.script.pop(0) if self.server.script else "ok"
+        if reply == "ok":
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(OK_BODY)))
+            self.end_headers()
+            self.wfile.write(OK_BODY)
+        elif reply == "truncated":
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            self.wfile.write(b"40\r\n" + OK_BODY[:10]) # Promises 64 bytes, then hangs up.
+            self.close_connection = True
+        elif reply == "badgzip":
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(OK_BODY)))
+            self.end_headers()
+            self.wfile.write(OK_BODY)
+        else:
+            self.send_response(reply)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class TestCensusClient(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.script = []
+        self.server.requests = 0
+        self.thread = threading.Thread(target = self.server.serve_forever,
+                                       kwargs = {"poll_interval": 0.01}, daemon = True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/area"
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def client(self, **kwargs) -> CensusClient:
+        return CensusClient(fccUrl = self.url, acsUrl = self.url, maxRetries = 2, backoff = 0,
+                            timeout = 5, **kwargs)
+
+    def test_retry_truncated_body(self) -> None:
+        self.server.script = ["truncated", "ok"]
+        self.assertEqual(self.client().get(self.url, {"lat": 42.3}), json.loads(OK_BODY))
+        self.assertEqual(self.server.requests, 2)
+
+    def test_retry_bad_content_encoding(self) -> None:
+        self.server.script = ["badgzip", "ok"]
+        self.assertEqual(self.client().get(self.url, {"lat": 42.3}), json.loads(OK_BODY))
+        self.assertEqual(self.server.requests, 2)
+
+    def test_retry_server_error(self) -> None:
+        self.server.script = [503, 429, "ok"]
+        self.assertEqual(self.client().get(self.url, {"lat": 42.3}), json.loads(OK_BODY))
+        self.assertEqual(self.server.requests, 3)
+
+    def test_give_up_after_retries(self) -> None:
+        self.server.script = ["truncated", "badgzip", "truncated"]
+        with self.assertRaises(CensusError):
+            self.client().get(self.url, {"lat": 42.3})
+        self.assertEqual(self.server.requests, 3)
+
+    def test_no_retry_on_client_error(self) -> None:
+        self.server.script = [404]
+        with self.assertRaises(CensusError):
+            self.client().get(self.url, {"lat": 42.3})
+        self.assertEqual(self.server.requests, 1)
+
+    def test_fetch_tracts_failed_lookup(self) -> None:
+        self.server.script = ["ok", 404]
+        tracts = self.client(maxWorkers = 1).fetchTracts([(42.3, -83.0), (42.4, -83.1)])
+        self.assertEqual(tracts, ["163517200", None])
+
+    def test_cache_hit(self) -> None:
+        client = self.client(cache = ResponseCache(":memory:"))
+        self.assertEqual(client.get(self.url, {"lat": 42.3}), json.loads(OK_BODY))
+        self.assertEqual(client.get(self.url, {"lat": 42.3}), json.loads(OK_BODY))
+        self.assertEqual(self.server.requests, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
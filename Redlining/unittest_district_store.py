@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+import numpy as np
+from district_store import DistrictStore, saveDistricts, districtColumn
+from red_lines import DetroitDistrict
+
+SQUARE = [[[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0], [0.0, 0.0]]]
+
+
+def makeDistricts() -> list:
+    '''
+    Three districts with a text column of different lengths (one not ASCII),
+    None values, and one district with two polygons.
+    '''
+    first = DetroitDistrict(SQUARE[0], "A", "A1", "Tree-lined streets", "darkgreen", medIncome = 52000,
+                            parts = [SQUARE])
+    second = DetroitDistrict(SQUARE[0], "D", "D2", None, "red", percent = 0.25,
+                             parts = [SQUARE, [[[2.0, 2.0], [3.0, 2.0], [2.5, 3.0], [2.0, 2.0]]]])
+    third = DetroitDistrict(SQUARE[0], "C", "C3", "Café district " * 20, "yellow", medIncome = 31000,
+                            parts = [SQUARE])
+    return [first, second, third]
+
+
+class TestDistrictStore(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.fileName = os.path.join(self.directory, "districts.npz")
+        self.districts = makeDistricts()
+        saveDistricts(self.fileName, self.districts)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self) -> None:
+        store = DistrictStore(self.fileName, DetroitDistrict)
+        self.assertEqual(len(store), 3)
+        for original, loaded in zip(self.districts, store):
+            self.assertEqual(vars(loaded), vars(original))
+
+    def test_columns(self) -> None:
+        store = DistrictStore(self.fileName, DetroitDistrict)
+        for name in ["id", "holcGrade", "description", "medIncome", "percent"]:
+            expected = districtColumn(self.districts, name)
+            loaded = store.column(name)
+            self.assertEqual(loaded.dtype, expected.dtype, name)
+            np.testing.assert_array_equal(loaded, expected)
+        self.assertEqual(store.districts, {}) # No district was built.
+
+    def test_memory_mapped(self) -> None:
+        with zipfile.ZipFile(self.fileName) as archive:
+            self.assertEqual({info.compress_type for info in archive.infolist()}, {zipfile.ZIP_STORED})
+        store = DistrictStore(self.fileName, DetroitDistrict)
+        self.assertIsInstance(store._array("vertices"), np.memmap)
+        self.assertIsInstance(store._array("medIncome"), np.memmap)
+        # Text is one UTF-8 blob, not a fixed-width array padded to the longest value.
+        self.assertEqual(store._array("description").dtype, np.uint8)
+        self.assertEqual(store[2].description, "Café district " * 20)
+        self.assertNotIn("description", store.columns) # Decoded alone, not the whole column.
+
+    def test_compressed_file(self) -> None:
+        # Files written before the format change are compressed and have fixed-width text.
+        arrays = dict(np.load(self.fileName))
+        del arrays["text:description"], arrays["text:id"], arrays["text:holcGrade"], arrays["text:holcColor"]
+        for name in ["description", "id", "holcGrade", "holcColor"]:
+            arrays[name] = np.array(["" if v is None else v for v in districtColumn(self.districts, name)], dtype = str)
+        np.savez_compressed(self.fileName, **arrays)
+        store = DistrictStore(self.fileName, DetroitDistrict)
+        for original, loaded in zip(self.districts, store):
+            self.assertEqual(vars(loaded), vars(original))
+
+    def test_changes_seen_by_column(self) -> None:
+        store = DistrictStore(self.fileName, DetroitDistrict)
+        store[1].medIncome = 12000
+        np.testing.assert_array_equal(store.column("medIncome"), [52000, 12000, 31000])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from matplotlib.path import Path
+from census_client import CensusClient
+from red_lines import RedLines
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "redlines_data.json")
+
+
+def containingIds(districts, point) -> set:
+    '''
+    Returns the ids of the districts that contain point, by the even-odd rule
+    over all of their rings, tested with matplotlib instead of PolygonSet.
+    '''
+    ids = set()
+    for d in districts:
+        inside = sum(Path(np.asarray(ring, dtype = float).reshape(-1, 2)).contains_point(point)
+                     for ring in d.rings())
+        if inside % 2:
+            ids.add(d.id)
+    return ids
+
+
+class TestRedLines(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.redLines = RedLines(client = CensusClient())
+        self.redLines.createDistricts(DATA_FILE)
+
+    def test_random_points_inside(self) -> None:
+        random.seed(17)
+        self.redLines.generateRandPoint()
+        for d in self.redLines.districts:
+            self.assertIsNotNone(d.randomLat, d.id)
+            self.assertIn(d.id, containingIds([d], (d.randomLong, d.randomLat)))
+
+    def test_random_points_reproducible(self) -> None:
+        points = []
+        for _ in range(2):
+            random.seed(17)
+            self.redLines.generateRandPoint()
+            points.append([(d.randomLong, d.randomLat) for d in self.redLines.districts])
+        self.assertEqual(points[0], points[1])
+
+    def test_locate(self) -> None:
+        random.seed(17)
+        self.redLines.generateRandPoint()
+        minLong, minLat, maxLong, maxLat = self.redLines.bounds()
+        rng = np.random.default_rng(5)
+        points = np.column_stack([rng.uniform(minLong - 0.01, maxLong + 0.01, 300),
+                                  rng.uniform(minLat - 0.01, maxLat + 0.01, 300)])
+        points = np.concatenate([points, [[d.randomLong, d.randomLat] for d in self.redLines.districts]])
+        found = self.redLines.locate(points)
+        self.assertEqual(len(found), len(points))
+        for point, districtId in zip(points, found):
+            expected = containingIds(self.redLines.districts, point)
+            if expected:
+                self.assertIn(districtId, expected) # Any of them where districts overlap.
+            else:
+                self.assertIsNone(districtId)
+        self.assertIsNone(self.redLines.locate([[maxLong + 1.0, maxLat + 1.0]])[0])
+
+    def test_locate_from_store(self) -> None:
+        directory = tempfile.mkdtemp()
+        try:
+            fileName = os.path.join(directory, "districts.npz")
+            self.redLines.cacheData(fileName)
+            loaded = RedLines(fileName, client = CensusClient())
+            random.seed(17)
+            self.redLines.generateRandPoint()
+            points = [[d.randomLong, d.randomLat] for d in self.redLines.districts]
+            self.assertEqual(list(loaded.locate(points)), list(self.redLines.locate(points)))
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
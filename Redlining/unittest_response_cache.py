@@ -0,0 +1,99 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from response_cache import ResponseCache
+
+URL = "https://geo.fcc.gov/api/census/area"
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.fileName = os.path.join(self.directory, "requests.sqlite")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_lazy_file(self) -> None:
+        cache = ResponseCache(self.fileName)
+        self.assertFalse(os.path.exists(self.fileName))
+        self.assertIsNone(cache.get(URL, {"lat": 42.3}))
+        self.assertTrue(os.path.exists(self.fileName))
+        cache.close()
+
+    def test_round_trip(self) -> None:
+        cache = ResponseCache(self.fileName)
+        cache.put(URL, {"lat": 42.300001, "lon": -83.0}, {"tract": "1"})
+        # Rounded to 5 decimals, so a nearby point hits the same entry.
+        self.assertEqual(cache.get(URL, {"lon": -83.0, "lat": 42.3}), {"tract": "1"})
+        cache.put(URL, {"lat": 42.3, "lon": -83.0}, {"tract": "2"})
+        self.assertEqual(cache.get(URL, {"lat": 42.3, "lon": -83.0}), {"tract": "2"})
+        self.assertEqual(len(cache), 1)
+        self.assertEqual((cache.hits, cache.misses), (2, 0))
+        cache.close()
+        self.assertEqual(ResponseCache(self.fileName).get(URL, {"lat": 42.3, "lon": -83.0}), {"tract": "2"})
+
+    def test_expired(self) -> None:
+        cache = ResponseCache(":memory:", ttl = -1)
+        cache.put(URL, {"lat": 1.0}, [1])
+        self.assertIsNone(cache.get(URL, {"lat": 1.0}))
+        self.assertEqual(len(cache), 0)
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache = ResponseCache(":memory:", maxEntries = 3)
+        for i in range(3):
+            cache.put(URL, {"i": i}, i)
+        cache.get(URL, {"i": 0})
+        cache.put(URL, {"i": 3}, 3)
+        self.assertEqual(len(cache), 3)
+        self.assertIsNone(cache.get(URL, {"i": 1}))
+        self.assertEqual([cache.get(URL, {"i": i}) for i in [0, 2, 3]], [0, 2, 3])
+
+    def test_no_count_per_put(self) -> None:
+        cache = ResponseCache(self.fileName, maxEntries = 50)
+        len(cache)
+        statements = []
+        cache._db.set_trace_callback(statements.append)
+        for i in range(200):
+            cache.put(URL, {"i": i}, i)
+        self.assertFalse([statement for statement in statements if "COUNT" in statement])
+        self.assertEqual(len(cache), 50)
+        self.assertEqual([cache.get(URL, {"i": i}) for i in [149, 150, 199]], [None, 150, 199])
+        statements.clear()
+        for i in range(150, 200): # Replacing rows never recounts.
+            cache.put(URL, {"i": i}, -i)
+        self.assertFalse([statement for statement in statements if "COUNT" in statement])
+        cache.close()
+
+    def test_shared_file(self) -> None:
+        first = ResponseCache(self.fileName, maxEntries = 10)
+        second = ResponseCache(self.fileName, maxEntries = 10)
+        first.RecountInterval = second.RecountInterval = 4
+        for i in range(20):
+            (first if i % 2 else second).put(URL, {"i": i}, i)
+        self.assertLessEqual(len(first), 10 + 4)
+        self.assertEqual(second.get(URL, {"i": 19}), 19)
+        first.close()
+        second.close()
+
+    def test_locked(self) -> None:
+        cache = ResponseCache(self.fileName, timeout = 0.05)
+        cache.put(URL, {"i": 1}, 1)
+        other = sqlite3.connect(self.fileName)
+        other.execute("BEGIN EXCLUSIVE")
+        cache.put(URL, {"i": 2}, 2) # Skipped, not raised.
+        self.assertIsNone(cache.get(URL, {"i": 1})) # A miss, not an error.
+        self.assertEqual(cache.errors, 2)
+        other.rollback()
+        other.close()
+        self.assertEqual(cache.get(URL, {"i": 1}), 1)
+        self.assertIsNone(cache.get(URL, {"i": 2}))
+        self.assertEqual(len(cache), 1)
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
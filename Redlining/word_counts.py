@@ -0,0 +1,127 @@
+import math
+import re
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Common English filler words left out of the counts; a set, so a lookup is O(1).
+STOPWORDS = frozenset(['the', 'of', 'and', 'in', 'to', 'a', 'is', 'for', 'on', 'that'])
+
+_wordPattern = re.compile(r"[a-z]+")
+
+
+def iterTokens(text, stopwords = STOPWORDS):
+    """
+    Yields the lowercase words of a text one at a time, skipping the stopwords.
+    """
+    for match in _wordPattern.finditer(text.lower()):
+        word = match.group()
+        if word not in stopwords:
+            yield word
+
+
+def iterNgrams(tokens, n = 1):
+    """
+    Yields the n-grams of a token stream as space-separated strings, with a sliding window.
+    """
+    if n == 1:
+        yield from tokens
+        return
+    window = deque(maxlen = n)
+    for token in tokens:
+        window.append(token)
+        if len(window) == n:
+            yield " ".join(window)
+
+
+def countWords(text, n = 1, stopwords = STOPWORDS) -> Counter:
+    """
+    Counts the n-grams of one text (after the stopwords are removed).
+    """
+    return Counter(iterNgrams(iterTokens(text or "", stopwords), n))
+
+
+def mergeCounts(keys, counts, groups) -> dict:
+    """
+    Merges per-text Counters into one Counter per group, in text order
+    (so ties keep the order in which the words first appeared).
+
+    Texts whose key is not in groups are ignored.
+    """
+    merged = {group: Counter() for group in groups}
+    for key, count in zip(keys, counts):
+        if key in merged:
+            merged[key].update(count)
+    return merged
+
+
+def _countChunk(task) -> dict:
+    """
+    The task of a worker process: counts every text of a chunk and merges them per group,
+    so only one Counter per group is sent back.
+    """
+    keys, texts, groups, n, stopwords = task
+    return mergeCounts(keys, (countWords(text, n, stopwords) for text in texts), groups)
+
+
+def countGroups(keys, texts, groups, n = 1, stopwords = STOPWORDS, workers = None, chunkSize = 1024) -> dict:
+    """
+    Counts the n-grams of every text and merges the counts per group, in a process pool if workers > 1.
+
+    Parameters
+    ----------
+    keys : list
+        The group of every text, e.g. the HOLC grades.
+    texts : list of str
+        The texts, e.g. the district descriptions; None counts as empty.
+    groups : list
+        The groups to count; texts of other groups are ignored.
+    n : int, optional
+        The length of the n-grams, 1 for single words.
+    stopwords : set of str, optional
+        The words left out before the n-grams are built.
+    workers : int, optional
+        The number of worker processes. None or 1 counts in this process,
+        which is faster for a few thousand texts.
+    chunkSize : int, optional
+        The number of texts sent to a worker at a time.
+
+    Returns
+    -------
+    dict
+        {group: Counter}, the terms in the order they first appear in the texts.
+    """
+    keys, texts = list(keys), list(texts)
+    if not workers or workers == 1:
+        return _countChunk((keys, texts, groups, n, stopwords))
+    tasks = [(keys[i:i + chunkSize], texts[i:i + chunkSize], groups, n, stopwords)
+             for i in range(0, len(texts), chunkSize)]
+    merged = {group: Counter() for group in groups}
+    with ProcessPoolExecutor(max_workers = workers) as executor:
+        for chunk in executor.map(_countChunk, tasks): # In order, so ties stay in text order.
+            for group, counts in chunk.items():
+                merged[group].update(counts)
+    return merged
+
+
+def tfidf(groupCounts) -> dict:
+    """
+    Scores the terms of every group by TF-IDF, each group being one document:
+    the term frequency in the group times the smoothed inverse group frequency
+    log((1 + groups) / (1 + groups with the term)) + 1, so terms common to every
+    group rank below the ones that set a group apart.
+
+    Returns
+    -------
+    dict
+        {group: Counter of term scores}, so most_common lists the best terms first.
+    """
+    documentFrequency = Counter()
+    for counts in groupCounts.values():
+        documentFrequency.update(counts.keys())
+    groups = len(groupCounts)
+    scores = {}
+    for group, counts in groupCounts.items():
+        total = sum(counts.values())
+        scores[group] = Counter({term: count / total * (math.log((1 + groups) / (1 + documentFrequency[term])) + 1)
+                                 for term, count in counts.items()})
+    return scores